@@ -1,8 +1,25 @@
 import os
+from typing import Optional
+
 import requests
 import streamlit as st
-from bs4 import BeautifulSoup  # pip install beautifulsoup4
-import google.generativeai as genai  # pip install google-generativeai
+
+from khmer_news import core, qa
+from khmer_news.backend_pool import (
+    LATENCY_WEIGHTED,
+    LEAST_OUTSTANDING,
+    BackendPool,
+    parse_backend_urls,
+)
+from khmer_news.batching import MicroBatcher
+from khmer_news.cache import TieredCache, answer_cache_key, summary_cache_key
+from khmer_news.http_cache import HttpCache
+from khmer_news.jobs import FAILED, Job, JobQueue
+from khmer_news.mapreduce import chunk_text, summarize_long
+from khmer_news.resilience import CircuitBreaker
+from khmer_news.retrieval import BM25Index, needs_retrieval
+from khmer_news.textrank import extractive_summary
+from khmer_news.tokens import estimate_tokens
 
 
 # ==============================
@@ -14,6 +31,123 @@ if "summary" not in st.session_state:
     st.session_state.summary = ""
 if "input_text" not in st.session_state:
     st.session_state.input_text = ""
+if "last_answer" not in st.session_state:
+    st.session_state.last_answer = ""
+if "summary_job" not in st.session_state:
+    st.session_state.summary_job = None
+    st.session_state.summary_job_text = ""
+    st.session_state.summary_preview = ""
+
+
+# ==============================
+# 🔌 HTTP CONNECTION POOL
+# ==============================
+# Number of hosts to keep a pool for (news sites + ngrok tunnel) and
+# connections kept alive per host. Override via environment variables.
+HTTP_POOL_CONNECTIONS = int(os.environ.get("HTTP_POOL_CONNECTIONS", "10"))
+HTTP_POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_MAXSIZE", "20"))
+HTTP_KEEP_ALIVE = os.environ.get("HTTP_KEEP_ALIVE", "1") != "0"
+
+
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    """
+    Process-wide pooled session shared by every Streamlit session, so reruns
+    reuse open TCP/TLS connections to news sites and the ngrok tunnel.
+    """
+    return core.make_session(
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        keep_alive=HTTP_KEEP_ALIVE,
+    )
+
+
+# Conditional-GET page cache (ETag / Last-Modified) for fetched articles.
+HTTP_CACHE_DB = os.environ.get("HTTP_CACHE_DB", os.path.join(".cache", "http_cache.sqlite"))
+
+
+@st.cache_resource
+def get_http_cache() -> HttpCache:
+    """Persistent page cache shared by all sessions."""
+    return HttpCache(HTTP_CACHE_DB)
+
+
+# ==============================
+# 🗄️ SUMMARY CACHE
+# ==============================
+# Set SUMMARY_CACHE_DB to a file path to also persist summaries on disk.
+SUMMARY_CACHE_SIZE = int(os.environ.get("SUMMARY_CACHE_SIZE", "512"))
+SUMMARY_CACHE_TTL = float(os.environ.get("SUMMARY_CACHE_TTL", str(24 * 3600)))
+SUMMARY_CACHE_DB = os.environ.get("SUMMARY_CACHE_DB") or None
+
+
+@st.cache_resource
+def get_summary_cache() -> TieredCache:
+    """Process-wide summary cache shared by all users of this app."""
+    return TieredCache(
+        max_entries=SUMMARY_CACHE_SIZE,
+        ttl_seconds=SUMMARY_CACHE_TTL,
+        db_path=SUMMARY_CACHE_DB,
+    )
+
+
+# Q&A answers; set ANSWER_CACHE_DB to persist them on disk.
+ANSWER_CACHE_SIZE = int(os.environ.get("ANSWER_CACHE_SIZE", "2048"))
+ANSWER_CACHE_TTL = float(os.environ.get("ANSWER_CACHE_TTL", str(24 * 3600)))
+ANSWER_CACHE_DB = os.environ.get("ANSWER_CACHE_DB") or None
+
+
+@st.cache_resource
+def get_answer_cache() -> TieredCache:
+    """Process-wide Gemini answer cache shared by all users of this app."""
+    return TieredCache(
+        max_entries=ANSWER_CACHE_SIZE,
+        ttl_seconds=ANSWER_CACHE_TTL,
+        db_path=ANSWER_CACHE_DB,
+    )
+
+
+@st.cache_resource(max_entries=8)
+def get_backend_pool(urls: tuple, strategy: str) -> BackendPool:
+    """One pool (with its health-check thread) per backend list and strategy."""
+    return BackendPool(urls, strategy=strategy, session=get_http_session())
+
+
+# Summarize calls from all sessions (whole short articles and map-reduce
+# chunks) are coalesced into /summarize_batch requests; set
+# SUMMARIZE_MICRO_BATCH=0 to disable.
+SUMMARIZE_MICRO_BATCH = os.environ.get("SUMMARIZE_MICRO_BATCH", "1") != "0"
+BATCH_WINDOW = float(os.environ.get("BATCH_WINDOW", "0.03"))
+MAX_BATCH = int(os.environ.get("MAX_BATCH", "8"))
+
+
+@st.cache_resource(max_entries=8)
+def get_batcher(urls: tuple, strategy: str) -> MicroBatcher:
+    """One micro-batcher per backend pool, shared by every session."""
+    pool = get_backend_pool(urls, strategy)
+    return MicroBatcher(
+        send_batch=pool.summarize_batch,
+        send_one=pool.summarize_item,
+        window=BATCH_WINDOW,
+        max_batch=MAX_BATCH,
+    )
+
+
+# Summaries run on a background worker pool; the UI polls the job.
+SUMMARY_JOB_WORKERS = int(os.environ.get("SUMMARY_JOB_WORKERS", "4"))
+JOB_POLL_INTERVAL = float(os.environ.get("JOB_POLL_INTERVAL", "1.0"))
+
+
+@st.cache_resource
+def get_job_queue() -> JobQueue:
+    """Process-wide summary job queue shared by all sessions."""
+    return JobQueue(workers=SUMMARY_JOB_WORKERS)
+
+
+@st.cache_resource
+def get_gemini_models() -> qa.GeminiModelCache:
+    """Configured Gemini models shared across sessions, keyed by API key hash."""
+    return qa.GeminiModelCache()
 
 
 # ==============================
@@ -21,12 +155,43 @@ if "input_text" not in st.session_state:
 # ==============================
 st.sidebar.title("Backend Settings")
 
-# Your FastAPI / ngrok URL from Kaggle logs
-api_base = st.sidebar.text_input(
-    "FastAPI / ngrok URL",
-    value="https://a31a00410145.ngrok-free.app",  # change if needed
-    help="Use the URL printed by the Kaggle notebook (without /summarize at the end).",
+# Your FastAPI / ngrok URL(s) from Kaggle logs
+api_bases = parse_backend_urls(
+    st.sidebar.text_area(
+        "FastAPI / ngrok URLs",
+        value="https://a31a00410145.ngrok-free.app",  # change if needed
+        help=(
+            "Use the URL printed by the Kaggle notebook (without /summarize at the end). "
+            "Add one URL per line to spread requests across several notebooks."
+        ),
+    )
 )
+api_base = api_bases[0] if api_bases else ""
+
+routing = LEAST_OUTSTANDING
+if len(api_bases) > 1:
+    routing = st.sidebar.selectbox(
+        "Routing",
+        [LEAST_OUTSTANDING, LATENCY_WEIGHTED],
+        format_func=lambda s: {
+            LEAST_OUTSTANDING: "Least outstanding requests",
+            LATENCY_WEIGHTED: "Latency-weighted",
+        }[s],
+    )
+
+backend_pool = get_backend_pool(tuple(api_bases), routing) if api_bases else None
+if backend_pool is not None:
+    backend_stats = backend_pool.stats()
+    down = [b["url"] for b in backend_stats if not b["available"]]
+    # Calls fail fast only while a circuit is open; an ejected backend with
+    # a closed circuit is still tried when nothing else is left.
+    if all(b["circuit"] == CircuitBreaker.OPEN for b in backend_stats):
+        st.sidebar.warning(
+            "Backend is failing; requests are paused briefly and the offline "
+            "summarizer is used meanwhile."
+        )
+    elif down:
+        st.sidebar.warning("Temporarily ejected: " + ", ".join(down))
 
 st.sidebar.markdown("---")
 st.sidebar.write(
@@ -35,6 +200,21 @@ st.sidebar.write(
     "3. Paste here and click *Summarize*"
 )
 
+job_counts = get_job_queue().stats()
+if job_counts["queued"] or job_counts["running"]:
+    st.sidebar.caption(
+        f"Summary jobs: {job_counts['running']} running / {job_counts['queued']} queued"
+    )
+
+for cache_label, cache_stats in (
+    ("Summary cache", get_summary_cache().stats()),
+    ("Answer cache", get_answer_cache().stats()),
+):
+    st.sidebar.caption(
+        f"{cache_label}: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+        f"({cache_stats['hit_rate']:.0%} hit rate)"
+    )
+
 st.sidebar.markdown("---")
 st.sidebar.subheader("Gemini Settings")
 
@@ -61,64 +241,140 @@ gemini_model_name = st.sidebar.text_input(
 def extract_main_text_from_url(url: str) -> str:
     """
     Fetches the URL and tries to extract the main article text.
-    Adds browser-like headers to avoid simple 403 blocks.
+    Shows the error and returns "" if the page cannot be fetched.
     """
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/120.0.0.0 Safari/537.36"
-        ),
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-        "Accept-Language": "en-US,en;q=0.9,km;q=0.8",
-        "Connection": "keep-alive",
-    }
-
     try:
-        resp = requests.get(url, headers=headers, timeout=10)
-        resp.raise_for_status()
+        return core.extract_main_text_from_url(
+            url, session=get_http_session(), http_cache=get_http_cache()
+        )
     except Exception as e:
         st.error(f"Error fetching URL: {e}")
         return ""
 
-    soup = BeautifulSoup(resp.text, "html.parser")
-    paragraphs = [p.get_text(strip=True) for p in soup.find_all("p")]
 
-    # Filter out super-short bits and join
-    text = "\n".join(p for p in paragraphs if len(p) > 40)
+@st.cache_resource(max_entries=64)
+def get_article_index(article: str) -> BM25Index:
+    """BM25 passage index per article, reused across questions and users."""
+    return BM25Index.from_text(article)
 
-    return text
 
-
-def ask_gemini_any_context(api_key: str, model_name: str, context: str, question: str) -> str:
+def article_context(article: str, question: str) -> str:
     """
-    Use Gemini to answer a question based on arbitrary context
-    (summary, original, or both).
+    The whole article if it is short, otherwise only the passages most
+    relevant to the question.
     """
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel(model_name)
-
-    prompt = f"""
-You are a helpful assistant answering questions using the context below.
-
-CONTEXT:
-{context}
-
-USER QUESTION:
-{question}
-
-Rules:
-- Answer in Khmer.
-- Base your answer ONLY on the context provided.
-- If the context doesn't contain enough information, say that you don't know
-  based on this context.
-"""
+    if not needs_retrieval(article):
+        return f"ORIGINAL ARTICLE:\n{article}"
+    passages = get_article_index(article).top_k(question)
+    return "RELEVANT ARTICLE PASSAGES:\n" + "\n...\n".join(passages)
+
+
+def show_offline_summary(text: str) -> None:
+    """Falls back to the in-process TextRank summary when the backend fails."""
+    fallback = extractive_summary(text)
+    if not fallback:
+        return
+    st.warning("Backend unavailable — showing an offline extractive summary instead.")
+    st.subheader("📌 Summary (Khmer, extractive)")
+    st.write(fallback)
+    st.session_state.summary = fallback
+    st.session_state.input_text = text
+
+
+def summarize_job(
+    text: str,
+    max_tokens: int,
+    temperature: float,
+    pool: BackendPool,
+    batcher: Optional[MicroBatcher],
+    cache: TieredCache,
+    cache_key: str,
+):
+    """
+    Job body for the summary queue; runs on a worker thread, so no st.*
+    calls. With a batcher, map-reduce chunks share /summarize_batch
+    requests with other sessions; single-chunk jobs join them only once a
+    batch call has succeeded, and stream tokens until then.
+    """
+    summarize_fn = batcher.summarize if batcher is not None else pool.summarize
+
+    def run(job: Job) -> str:
+        n_chunks = len(chunk_text(text))
+        if n_chunks > 1:
+            job.message = f"Long article: summarizing {n_chunks} parts in parallel, then combining."
+            summary = summarize_long(
+                text,
+                pool.key,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                session=pool.session,
+                summarize_fn=summarize_fn,
+            )
+        elif batcher is not None and batcher.batching_confirmed:
+            job.message = "Generating summary with your fine-tuned Khmer model..."
+            summary = batcher.summarize(text, max_tokens=max_tokens, temperature=temperature)
+        else:
+            # Tokens are appended as they arrive; falls back to one blocking call.
+            job.message = "Generating summary with your fine-tuned Khmer model..."
+            for piece in pool.iter_summary(text, max_tokens=max_tokens, temperature=temperature):
+                job.append(piece)
+            summary = job.partial
+        summary = summary.strip()
+        if summary:
+            cache.set(cache_key, summary)
+        return summary
+
+    return run
+
+
+@st.fragment(run_every=JOB_POLL_INTERVAL)
+def poll_summary_job(job_id: str, preview: str) -> None:
+    """Shows progress of a running summary job; reruns the app once it finishes."""
+    job = get_job_queue().get(job_id)
+    if job is None or job.done:
+        st.rerun()
+    st.caption(f"{job.message or 'Waiting for a free worker...'} ({job.elapsed:.0f}s)")
+    if job.partial:
+        st.subheader("📌 Summary (Khmer)")
+        st.write(job.partial)
+    elif preview:
+        st.caption("Quick preview (extractive): " + preview)
+
+
+def show_summary_job_result(job: Job, text: str) -> None:
+    """
+    Applies a finished job to the session exactly once, on the rerun that
+    follows it finishing; later reruns must not overwrite newer input.
+    """
+    st.session_state.summary_job = None
+    if job.status == FAILED:
+        e = job.error
+        if not isinstance(e, requests.exceptions.RequestException):
+            st.error(f"Unexpected error: {e}")
+            return
+        st.error(f"Request error: {e}")
+        if getattr(e, "response", None) is not None:
+            try:
+                st.code(e.response.text, language="json")
+            except Exception:
+                st.code(str(e.response.text))
+        show_offline_summary(text)
+    elif not job.result:
+        st.error("Backend returned an empty summary.")
+    else:
+        st.subheader("📌 Summary (Khmer)")
+        st.write(job.result)
+        st.session_state.summary = job.result
+        st.session_state.input_text = text  # keep latest original
 
-    response = model.generate_content(prompt)
-    if not response or not getattr(response, "text", ""):
-        return "មិនអាចឆ្លើយបានពីបរិបទនេះទេ។"
 
-    return response.text.strip()
+def ask_gemini_any_context(api_key: str, model_name: str, context: str, question: str):
+    """
+    Use Gemini to answer a question based on arbitrary context
+    (summary, original, or both). Yields the answer as it is generated.
+    """
+    model = get_gemini_models().get(api_key, model_name)
+    yield from qa.stream_answer(model, context, question)
 
 
 # ==============================
@@ -170,6 +426,8 @@ with col1:
         placeholder="Paste your Khmer article or paragraph here...",
         value=st.session_state.input_text,
     )
+    if input_text.strip():
+        st.caption(f"≈ {estimate_tokens(input_text):,} input tokens")
 
 with col2:
     st.markdown("#### Options")
@@ -183,44 +441,57 @@ summarize_clicked = st.button("✨ Summarize")
 # 🧠 CALL BACKEND (SUMMARIZER)
 # ==============================
 if summarize_clicked:
-    if not api_base:
+    if backend_pool is None:
         st.error("Please provide your FastAPI ngrok URL in the sidebar.")
     elif not input_text.strip():
         st.warning("Please paste some text or fetch from URL first.")
     else:
-        endpoint = api_base.rstrip("/") + "/summarize"
-
-        payload = {
-            "text": input_text,
-            "max_tokens": max_tokens,
-            "temperature": float(temperature),
-        }
-
-        st.info(f"Sending request to: `{endpoint}`")
-        with st.spinner("Generating summary with your fine-tuned Khmer model..."):
-            try:
-                resp = requests.post(endpoint, json=payload, timeout=120)
-                resp.raise_for_status()
-                data = resp.json()
-                summary = data.get("summary", "").strip()
-
-                if not summary:
-                    st.error("Backend returned an empty summary.")
-                else:
-                    st.session_state.summary = summary
-                    st.session_state.input_text = input_text  # keep latest original
-                    st.subheader("📌 Summary (Khmer)")
-                    st.write(summary)
-
-            except requests.exceptions.RequestException as e:
-                st.error(f"Request error: {e}")
-                if getattr(e, "response", None) is not None:
-                    try:
-                        st.code(e.response.text, language="json")
-                    except Exception:
-                        st.code(str(e.response.text))
-            except Exception as e:
-                st.error(f"Unexpected error: {e}")
+        cache = get_summary_cache()
+        cache_key = summary_cache_key(input_text, max_tokens, temperature, backend_pool.key)
+        cached_summary = cache.get(cache_key)
+
+        if cached_summary:
+            st.session_state.summary_job = None
+            st.info("Loaded summary from cache.")
+            st.subheader("📌 Summary (Khmer)")
+            st.write(cached_summary)
+            st.session_state.summary = cached_summary
+            st.session_state.input_text = input_text  # keep latest original
+        else:
+            if len(backend_pool.backends) > 1:
+                st.info(f"Sending request to one of {len(backend_pool.backends)} backends.")
+            else:
+                st.info(f"Sending request to: `{core.summarize_endpoint(api_base)}`")
+            # Identical requests already queued or running (e.g. many users
+            # pasting the same breaking story) share that job.
+            job = get_job_queue().submit(
+                summarize_job(
+                    input_text,
+                    max_tokens,
+                    temperature,
+                    backend_pool,
+                    batcher=(
+                        get_batcher(tuple(api_bases), routing) if SUMMARIZE_MICRO_BATCH else None
+                    ),
+                    cache=cache,
+                    cache_key=cache_key,
+                ),
+                key=cache_key,
+            )
+            st.session_state.summary_job = job.id
+            st.session_state.summary_job_text = input_text
+            # Instant extractive preview while the abstractive summary is generated.
+            st.session_state.summary_preview = extractive_summary(input_text)
+
+summary_job = (
+    get_job_queue().get(st.session_state.summary_job) if st.session_state.summary_job else None
+)
+if summary_job is None:
+    st.session_state.summary_job = None
+elif summary_job.done:
+    show_summary_job_result(summary_job, st.session_state.summary_job_text)
+else:
+    poll_summary_job(summary_job.id, st.session_state.summary_preview)
 
 
 # ==============================
@@ -275,7 +546,7 @@ if st.session_state.summary:
                 else:
                     context_text = (
                         f"SUMMARY:\n{st.session_state.summary}\n\n"
-                        f"ORIGINAL ARTICLE:\n{st.session_state.input_text}"
+                        + article_context(st.session_state.input_text, question)
                     )
 
             else:  # Original Article Only
@@ -286,17 +557,33 @@ if st.session_state.summary:
                     )
                     context_text = f"SUMMARY:\n{st.session_state.summary}"
                 else:
-                    context_text = f"ORIGINAL ARTICLE:\n{st.session_state.input_text}"
-
-            with st.spinner("Asking Gemini about the selected context..."):
-                try:
-                    answer = ask_gemini_any_context(
-                        api_key=gemini_api_key,
-                        model_name=gemini_model_name,
-                        context=context_text,
-                        question=question,
-                    )
-                    st.subheader("🧠 Gemini's Answer")
+                    context_text = article_context(st.session_state.input_text, question)
+
+            st.caption(f"≈ {estimate_tokens(context_text, profile='gemini'):,} context tokens")
+            answer_cache = get_answer_cache()
+            answer_key = answer_cache_key(
+                context_text, question, gemini_model_name, context_mode
+            )
+            cached_answer = answer_cache.get(answer_key)
+
+            try:
+                st.subheader("🧠 Gemini's Answer")
+                if cached_answer:
+                    answer = cached_answer
                     st.write(answer)
-                except Exception as e:
-                    st.error(f"Error calling Gemini API: {e}")
+                    st.caption("Answered from cache.")
+                else:
+                    streamed = st.write_stream(
+                        ask_gemini_any_context(
+                            api_key=gemini_api_key,
+                            model_name=gemini_model_name,
+                            context=context_text,
+                            question=question,
+                        )
+                    )
+                    answer = (streamed if isinstance(streamed, str) else "".join(streamed)).strip()
+                    if answer and answer != qa.NO_ANSWER:
+                        answer_cache.set(answer_key, answer)
+                st.session_state.last_answer = answer
+            except Exception as e:
+                st.error(f"Error calling Gemini API: {e}")
@@ -0,0 +1,3 @@
+"""
+Core, Streamlit-free building blocks of the Khmer News Summarizer.
+"""
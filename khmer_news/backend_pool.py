@@ -0,0 +1,264 @@
+"""
+Load balancing across several /summarize backends (e.g. one per Kaggle
+notebook).
+
+Routing is least-outstanding-requests (ties broken by observed latency) or
+latency-weighted (EWMA latency x (outstanding + 1)). A backend is ejected
+while its circuit breaker is open or its last health check failed; a
+background thread probes every backend periodically so ejected ones are
+re-admitted once they answer again. Failed calls fail over to the next
+backend.
+"""
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Sequence
+
+import requests
+
+from khmer_news import core
+from khmer_news.resilience import (
+    CircuitBreaker,
+    breaker_for,
+    is_backend_failure,
+    is_ngrok_error,
+)
+
+
+HEALTH_CHECK_INTERVAL = 15.0
+HEALTH_CHECK_TIMEOUT = 3.0
+# Weight of the newest sample in the latency moving average.
+LATENCY_ALPHA = 0.3
+
+LEAST_OUTSTANDING = "least_outstanding"
+LATENCY_WEIGHTED = "latency"
+
+
+class Backend:
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.outstanding = 0
+        self.latency = 1.0  # seconds, EWMA
+        self.healthy = True
+        self.requests = 0
+        self.failures = 0
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        return breaker_for(self.url)
+
+    @property
+    def available(self) -> bool:
+        return self.healthy and self.breaker.state != CircuitBreaker.OPEN
+
+    def stats(self) -> dict:
+        return {
+            "url": self.url,
+            "available": self.available,
+            "circuit": self.breaker.state,
+            "outstanding": self.outstanding,
+            "latency": round(self.latency, 3),
+            "requests": self.requests,
+            "failures": self.failures,
+        }
+
+
+class BackendPool:
+    """Thread-safe pool of /summarize backends."""
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        strategy: str = LEAST_OUTSTANDING,
+        health_check_interval: Optional[float] = HEALTH_CHECK_INTERVAL,
+        session: Optional[requests.Session] = None,
+    ):
+        urls = [u.strip() for u in urls if u.strip()]
+        if not urls:
+            raise ValueError("BackendPool needs at least one backend URL")
+        self.backends: List[Backend] = [Backend(u) for u in dict.fromkeys(urls)]
+        self.strategy = strategy
+        self.session = session
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        if health_check_interval:
+            _start_health_checks(self, health_check_interval)
+
+    @property
+    def key(self) -> str:
+        """Stable identity of the pool, used in cache keys."""
+        return ",".join(sorted(b.url for b in self.backends))
+
+    # ------ routing ------
+    def _score(self, backend: Backend) -> tuple:
+        if self.strategy == LATENCY_WEIGHTED:
+            return (backend.latency * (backend.outstanding + 1),)
+        return (backend.outstanding, backend.latency)
+
+    def pick(self, exclude: Sequence[Backend] = ()) -> Backend:
+        """Best available backend; falls back to any non-excluded one."""
+        with self._lock:
+            candidates = [b for b in self.backends if b not in exclude]
+            available = [b for b in candidates if b.available] or candidates
+            if not available:
+                raise requests.exceptions.ConnectionError("No summarize backends left to try")
+            return min(available, key=self._score)
+
+    @contextmanager
+    def _track(self, backend: Backend) -> Iterator[dict]:
+        """Counts an in-flight call; set outcome["ok"] = False to record a handled failure."""
+        with self._lock:
+            backend.outstanding += 1
+            backend.requests += 1
+        started = time.monotonic()
+        outcome = {"ok": True}
+        try:
+            yield outcome
+        except BaseException:
+            outcome["ok"] = False
+            raise
+        finally:
+            elapsed = time.monotonic() - started
+            with self._lock:
+                backend.outstanding -= 1
+                if outcome["ok"]:
+                    backend.latency += LATENCY_ALPHA * (elapsed - backend.latency)
+                else:
+                    backend.failures += 1
+
+    def _with_failover(self, call):
+        tried: List[Backend] = []
+        while True:
+            backend = self.pick(exclude=tried)
+            tried.append(backend)
+            try:
+                with self._track(backend):
+                    return call(backend)
+            except requests.exceptions.RequestException as e:
+                if not is_backend_failure(e) or len(tried) >= len(self.backends):
+                    raise
+
+    # ------ calls ------
+    def summarize(
+        self,
+        text: str,
+        api_base: Optional[str] = None,
+        max_tokens: int = 256,
+        temperature: float = 0.5,
+        session: Optional[requests.Session] = None,
+    ) -> str:
+        """
+        core.summarize on the best backend, failing over on backend errors.
+        `api_base` is ignored; it keeps the signature interchangeable with
+        core.summarize (e.g. as mapreduce's summarize_fn).
+        """
+        return self._with_failover(
+            lambda b: core.summarize(
+                text,
+                b.url,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                session=session or self.session,
+            )
+        )
+
+    def summarize_batch(
+        self, items: List[dict], session: Optional[requests.Session] = None
+    ) -> list:
+        """core.summarize_batch on the best backend, failing over on backend errors."""
+        return self._with_failover(
+            lambda b: core.summarize_batch(items, b.url, session=session or self.session)
+        )
+
+    def summarize_item(self, item: dict) -> str:
+        """Single-item fallback for MicroBatcher."""
+        return self.summarize(
+            item["text"], max_tokens=item["max_tokens"], temperature=item["temperature"]
+        )
+
+    def iter_summary(
+        self,
+        text: str,
+        max_tokens: int = 256,
+        temperature: float = 0.5,
+        session: Optional[requests.Session] = None,
+    ) -> Iterator[str]:
+        """
+        Streams from the best backend. Fails over only before the first
+        piece arrives; a stream that breaks midway raises.
+        """
+        tried: List[Backend] = []
+        while True:
+            backend = self.pick(exclude=tried)
+            tried.append(backend)
+            pieces = core.iter_summary(
+                text,
+                backend.url,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                session=session or self.session,
+            )
+            with self._track(backend) as outcome:
+                try:
+                    first = next(pieces, None)
+                except requests.exceptions.RequestException as e:
+                    if not is_backend_failure(e) or len(tried) >= len(self.backends):
+                        raise
+                    outcome["ok"] = False
+                    continue
+                if first is not None:
+                    yield first
+                    yield from pieces
+            return
+
+    # ------ health ------
+    def check_health(self) -> None:
+        """
+        Probes every backend's /health. A 2xx counts as alive. A plain 404
+        means the backend has no /health route, so it is left to its
+        breaker; ngrok's 404 for an offline tunnel (Ngrok-Error-Code) and
+        anything else count as down. Probes never reset a backend's
+        breaker; its half-open trial call does that.
+        """
+        for backend in self.backends:
+            try:
+                resp = (self.session or requests).get(
+                    backend.url + "/health", timeout=HEALTH_CHECK_TIMEOUT
+                )
+                alive = 200 <= resp.status_code < 300 or (
+                    resp.status_code == 404 and not is_ngrok_error(resp)
+                )
+                resp.close()
+            except requests.exceptions.RequestException:
+                alive = False
+            with self._lock:
+                backend.healthy = alive
+
+    def close(self) -> None:
+        self._stop.set()
+
+    def stats(self) -> List[dict]:
+        with self._lock:
+            return [b.stats() for b in self.backends]
+
+
+def _start_health_checks(pool: BackendPool, interval: float) -> None:
+    """Daemon thread that stops once the pool is closed or garbage-collected."""
+    pool_ref = weakref.ref(pool)
+    stop = pool._stop
+
+    def run() -> None:
+        while not stop.wait(interval):
+            current = pool_ref()
+            if current is None:
+                return
+            current.check_health()
+            del current
+
+    threading.Thread(target=run, name="backend-health", daemon=True).start()
+
+
+def parse_backend_urls(value: str) -> List[str]:
+    """Backend URLs from a newline- or comma-separated string."""
+    return [u.strip() for u in value.replace(",", "\n").splitlines() if u.strip()]
@@ -0,0 +1,226 @@
+"""
+Headless batch summarizer.
+
+    python -m khmer_news.batch --api-base https://xxxx.ngrok-free.app \
+        --urls urls.txt --out summaries.jsonl --concurrency 16
+
+Input is either a file of URLs (one per line, `#` comments allowed) or a
+JSONL file of objects with a "text" field (an optional "id" is echoed back).
+Each output line is a JSON object with the input's id/url, the summary and,
+on failure, an "error" message. Lines are written as items complete, so
+output order does not follow input order.
+"""
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterator, Optional
+
+from khmer_news.backend_pool import (
+    LATENCY_WEIGHTED,
+    LEAST_OUTSTANDING,
+    BackendPool,
+    parse_backend_urls,
+)
+from khmer_news.batching import MicroBatcher
+from khmer_news.cache import TieredCache, summary_cache_key
+from khmer_news.http_cache import HttpCache
+from khmer_news.core import (
+    extract_main_text,
+    extract_main_text_from_url,
+    make_session,
+)
+from khmer_news.mapreduce import summarize_long
+from khmer_news.singleflight import SingleFlight
+
+
+_inflight = SingleFlight()
+
+
+def read_urls(path: str) -> Iterator[dict]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield {"url": line}
+
+
+def read_texts(path: str) -> Iterator[dict]:
+    with open(path, encoding="utf-8") as f:
+        for n, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            # A malformed line becomes one failed item instead of aborting the run.
+            try:
+                obj = json.loads(line)
+                yield {"id": obj.get("id", n), "text": obj["text"]}
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                yield {"id": n, "error": f"bad input line: {type(e).__name__}: {e}"}
+
+
+def process_item(
+    item: dict,
+    args,
+    session,
+    backends: BackendPool,
+    cache: Optional[TieredCache],
+    http_cache: Optional[HttpCache] = None,
+    summarize_fn: Optional[Callable] = None,
+) -> dict:
+    result = {k: v for k, v in item.items() if k not in ("text", "html")}
+    if "error" in item:
+        return result
+    try:
+        text = item.get("text")
+        if text is None and "html" in item:
+            text = extract_main_text(item["html"], url=item["url"])
+        elif text is None:
+            text = extract_main_text_from_url(
+                item["url"], session=session, http_cache=http_cache
+            )
+        if not text.strip():
+            result["error"] = "no text extracted"
+            return result
+
+        key = summary_cache_key(text, args.max_tokens, args.temperature, backends.key)
+        summary = cache.get(key) if cache is not None else None
+        if not summary:
+
+            def run() -> str:
+                summary = summarize_long(
+                    text,
+                    backends.key,
+                    max_tokens=args.max_tokens,
+                    temperature=args.temperature,
+                    session=session,
+                    summarize_fn=summarize_fn or backends.summarize,
+                )
+                if summary and cache is not None:
+                    cache.set(key, summary)
+                return summary
+
+            # Duplicate inputs in the same run share one backend call.
+            summary = _inflight.do(key, run)
+
+        if summary:
+            result["summary"] = summary
+        else:
+            result["error"] = "backend returned an empty summary"
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Batch Khmer news summarizer")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--urls", help="File with one article URL per line")
+    source.add_argument("--texts", help="JSONL file of {\"id\": ..., \"text\": ...}")
+    parser.add_argument(
+        "--api-base",
+        required=True,
+        help="FastAPI / ngrok base URL; comma-separate several to load-balance",
+    )
+    parser.add_argument(
+        "--routing",
+        choices=[LEAST_OUTSTANDING, LATENCY_WEIGHTED],
+        default=LEAST_OUTSTANDING,
+    )
+    parser.add_argument(
+        "--micro-batch",
+        action="store_true",
+        help="Coalesce concurrent summarize calls into /summarize_batch requests",
+    )
+    parser.add_argument("--out", default="-", help="Output JSONL path (default: stdout)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--max-tokens", type=int, default=256)
+    parser.add_argument("--temperature", type=float, default=0.5)
+    parser.add_argument("--cache-db", help="Optional SQLite file for the summary cache")
+    parser.add_argument("--http-cache-db", help="Optional SQLite file for conditional-GET page cache")
+    parser.add_argument(
+        "--async-fetch",
+        action="store_true",
+        help="Download --urls with the asyncio fetcher (per-domain rate limits)",
+    )
+    parser.add_argument("--fetch-concurrency", type=int, default=32)
+    parser.add_argument("--per-domain-rate", type=float, default=1.0, help="Requests/second per host")
+    parser.add_argument("--politeness-delay", type=float, default=0.5)
+    return parser.parse_args(argv)
+
+
+def fetched_items(args) -> Iterator[dict]:
+    """Streams pages from the async fetcher as they arrive."""
+    from khmer_news.async_fetch import AsyncFetcher, iter_fetch
+
+    fetcher = AsyncFetcher(
+        concurrency=args.fetch_concurrency,
+        per_domain_rate=args.per_domain_rate,
+        politeness_delay=args.politeness_delay,
+    )
+    urls = [item["url"] for item in read_urls(args.urls)]
+    for page in iter_fetch(urls, fetcher):
+        if page.ok:
+            yield {"url": page.url, "html": page.html}
+        else:
+            yield {"url": page.url, "error": page.error}
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.texts:
+        items = read_texts(args.texts)
+    elif args.async_fetch:
+        items = fetched_items(args)
+    else:
+        items = read_urls(args.urls)
+
+    session = make_session(pool_maxsize=max(args.concurrency, 10))
+    http_cache = HttpCache(args.http_cache_db) if args.http_cache_db else None
+    backends = BackendPool(
+        parse_backend_urls(args.api_base), strategy=args.routing, session=session
+    )
+    batcher = (
+        MicroBatcher(send_batch=backends.summarize_batch, send_one=backends.summarize_item)
+        if args.micro_batch
+        else None
+    )
+    summarize_fn = batcher.summarize if batcher is not None else None
+    cache = TieredCache(db_path=args.cache_db) if args.cache_db else None
+    out = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8")
+
+    done = failed = 0
+    started = time.monotonic()
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            futures = [
+                pool.submit(
+                    process_item, item, args, session, backends, cache, http_cache, summarize_fn
+                )
+                for item in items
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                out.flush()
+                done += 1
+                failed += "error" in result
+    finally:
+        if batcher is not None:
+            batcher.close()
+        backends.close()
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.monotonic() - started
+    rate = done / elapsed * 3600 if elapsed else 0.0
+    print(
+        f"{done} items ({failed} failed) in {elapsed:.1f}s — {rate:.0f} items/hour",
+        file=sys.stderr,
+    )
+    return 1 if failed and failed == done else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
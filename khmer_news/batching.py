@@ -0,0 +1,165 @@
+"""
+Micro-batching of concurrent summarize calls.
+
+Requests arriving within a short window (or until `max_batch` items are
+queued) are sent as one POST /summarize_batch call and results are fanned
+back to the waiting callers. Contract:
+
+    request:  {"items": [{"text": ..., "max_tokens": ..., "temperature": ...}, ...]}
+    response: {"results": [{"summary": ...} | {"error": ...}, ...]}   (same order)
+
+If the backend has no batch endpoint, the batcher switches to sending
+items one by one, in parallel.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional, Union
+
+import requests
+
+
+BATCH_WINDOW = 0.03  # seconds
+MAX_BATCH = 8
+SEND_WORKERS = 4
+
+
+class BatchUnsupported(Exception):
+    """The backend has no /summarize_batch endpoint."""
+
+
+class BatchItemError(Exception):
+    """The backend reported an error for one item of a batch."""
+
+
+# One result per item: the summary, or the exception for that item.
+BatchResult = Union[str, Exception]
+
+
+class MicroBatcher:
+    """
+    Collects summarize requests from many threads into batched calls.
+
+    `send_batch(items)` returns one BatchResult per item (or raises
+    BatchUnsupported); `send_one(item)` is the single-item fallback.
+    """
+
+    def __init__(
+        self,
+        send_batch: Callable[[List[dict]], List[BatchResult]],
+        send_one: Callable[[dict], str],
+        window: float = BATCH_WINDOW,
+        max_batch: int = MAX_BATCH,
+        workers: int = SEND_WORKERS,
+    ):
+        self.send_batch = send_batch
+        self.send_one = send_one
+        self.window = window
+        self.max_batch = max_batch
+        # None until the backend has answered a batch call; then True/False.
+        self.batch_support: Optional[bool] = None
+        self.batches_sent = 0
+        self.items_sent = 0
+        self._queue: "queue.Queue" = queue.Queue()
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="summarize-batch"
+        )
+        self._closed = False
+        self._dispatcher = threading.Thread(
+            target=self._dispatch, name="micro-batcher", daemon=True
+        )
+        self._dispatcher.start()
+
+    # ------ public ------
+    @property
+    def batching_confirmed(self) -> bool:
+        """True once a /summarize_batch call has succeeded."""
+        return self.batch_support is True
+
+    def submit(self, text: str, max_tokens: int = 256, temperature: float = 0.5) -> Future:
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed")
+        future: Future = Future()
+        item = {"text": text, "max_tokens": max_tokens, "temperature": float(temperature)}
+        self._queue.put((item, future))
+        return future
+
+    def summarize(
+        self,
+        text: str,
+        api_base: Optional[str] = None,
+        max_tokens: int = 256,
+        temperature: float = 0.5,
+        session: Optional[requests.Session] = None,
+    ) -> str:
+        """
+        Blocking call with the same signature as core.summarize, so it can
+        be used as mapreduce's summarize_fn. `api_base` and `session` are
+        ignored; the batcher's senders decide where requests go.
+        """
+        return self.submit(text, max_tokens, temperature).result()
+
+    def close(self) -> None:
+        self._closed = True
+        self._queue.put(None)
+        self._dispatcher.join(timeout=1)
+        self._executor.shutdown(wait=False)
+
+    # ------ internals ------
+    def _collect(self, first) -> list:
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                entry = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if entry is None:
+                self._queue.put(None)  # keep the shutdown marker for the loop
+                break
+            batch.append(entry)
+        return batch
+
+    def _dispatch(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = self._collect(first)
+            self._executor.submit(self._send, batch)
+
+    def _send(self, batch: list) -> None:
+        items = [item for item, _ in batch]
+        futures = [future for _, future in batch]
+
+        if self.batch_support is not False and len(items) > 1:
+            try:
+                results = self.send_batch(items)
+                self.batch_support = True
+                self.batches_sent += 1
+                self.items_sent += len(items)
+                for future, result in zip(futures, results):
+                    if isinstance(result, Exception):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result)
+                return
+            except BatchUnsupported:
+                self.batch_support = False
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                return
+
+        for item, future in zip(items, futures):
+            self._executor.submit(self._send_single, item, future)
+
+    def _send_single(self, item: dict, future: Future) -> None:
+        try:
+            future.set_result(self.send_one(item))
+        except Exception as e:
+            future.set_exception(e)
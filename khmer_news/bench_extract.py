@@ -0,0 +1,63 @@
+"""
+Compares extraction parsers over a corpus of saved pages.
+
+    python -m khmer_news.bench_extract saved_pages/ --repeat 5
+
+Every *.html / *.htm file under the directory is extracted with each
+available parser; reports total and per-page time, plus how many pages
+produced different text than the first parser.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+from khmer_news.extract import PARSERS, extract_main_text
+
+
+def load_corpus(directory: str):
+    paths = sorted(
+        glob.glob(os.path.join(directory, "**", "*.htm*"), recursive=True)
+    )
+    pages = []
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            pages.append(f.read())
+    return pages
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark article extraction parsers")
+    parser.add_argument("corpus", help="Directory of saved .html pages")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    pages = load_corpus(args.corpus)
+    if not pages:
+        print(f"No .html files found under {args.corpus}", file=sys.stderr)
+        return 1
+    size_mb = sum(len(p.encode("utf-8")) for p in pages) / 1e6
+    print(f"{len(pages)} pages, {size_mb:.1f} MB, {args.repeat} repeats\n")
+
+    baseline = None
+    for name in PARSERS:
+        best = float("inf")
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            texts = [extract_main_text(page, parser=name) for page in pages]
+            best = min(best, time.perf_counter() - started)
+        if baseline is None:
+            baseline = texts
+            diffs = 0
+        else:
+            diffs = sum(a != b for a, b in zip(baseline, texts))
+        print(
+            f"{name:<12} {best:8.3f}s total  {best / len(pages) * 1000:8.2f} ms/page  "
+            f"{len(pages) / best:8.1f} pages/s  {diffs} pages differ"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+# ==============================
+# 🔑 KEYS
+# ==============================
+def normalize_text(text: str) -> str:
+    """
+    Normalizes text so trivially different copies of the same article
+    (NFC vs NFD, extra whitespace, trailing newlines) share one cache key.
+    """
+    text = unicodedata.normalize("NFC", text)
+    return " ".join(text.split())
+
+
+def make_key(*parts: Any) -> str:
+    """Stable SHA-256 key over JSON-serializable parts."""
+    raw = json.dumps(parts, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def summary_cache_key(text: str, max_tokens: int, temperature: float, backend_url: str) -> str:
+    """Content-addressed key for one /summarize call."""
+    text_hash = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    return make_key(
+        "summary",
+        text_hash,
+        int(max_tokens),
+        round(float(temperature), 3),
+        backend_url.rstrip("/"),
+    )
+
+
+def normalize_question(question: str) -> str:
+    """Case-, whitespace- and trailing-punctuation-insensitive question form."""
+    return normalize_text(question).lower().rstrip(" ?？!។៕.")
+
+
+def answer_cache_key(context: str, question: str, model_name: str, context_mode: str) -> str:
+    """Key for one Gemini Q&A answer."""
+    context_hash = hashlib.sha256(normalize_text(context).encode("utf-8")).hexdigest()
+    return make_key("answer", context_hash, normalize_question(question), model_name, context_mode)
+
+
+# ==============================
+# 🗄️ TIERED CACHE
+# ==============================
+class TieredCache:
+    """
+    Two-tier cache: an in-memory LRU in front of an optional SQLite file.
+
+    Both tiers honour the same TTL. The memory tier is bounded by
+    `max_entries`, the disk tier by `max_disk_entries` (oldest rows are
+    evicted first). Values must be JSON-serializable.
+    Safe to share across Streamlit sessions / threads.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl_seconds: Optional[float] = 24 * 3600,
+        db_path: Optional[str] = None,
+        max_disk_entries: int = 50_000,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_entries = max_disk_entries
+        self._mem: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " created REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS cache_created ON cache(created)")
+            self._db.commit()
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl_seconds is not None and time.time() - created > self.ttl_seconds
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._mem.get(key)
+            if entry is not None:
+                value, created = entry
+                if not self._expired(created):
+                    self._mem.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._mem[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created FROM cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    raw, created = row
+                    if not self._expired(created):
+                        value = json.loads(raw)
+                        self._remember(key, value, created)
+                        self.hits += 1
+                        self.disk_hits += 1
+                        return value
+                    self._db.execute("DELETE FROM cache WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self.misses += 1
+            return default
+
+    def set(self, key: str, value: Any) -> None:
+        created = time.time()
+        with self._lock:
+            self._remember(key, value, created)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, created) VALUES (?, ?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False), created),
+                )
+                self._evict_disk()
+                self._db.commit()
+
+    def _remember(self, key: str, value: Any, created: float) -> None:
+        self._mem[key] = (value, created)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+
+    def _evict_disk(self) -> None:
+        if self.ttl_seconds is not None:
+            self._db.execute(
+                "DELETE FROM cache WHERE created < ?", (time.time() - self.ttl_seconds,)
+            )
+        (count,) = self._db.execute("SELECT COUNT(*) FROM cache").fetchone()
+        overflow = count - self.max_disk_entries
+        if overflow > 0:
+            self._db.execute(
+                "DELETE FROM cache WHERE key IN "
+                "(SELECT key FROM cache ORDER BY created ASC LIMIT ?)",
+                (overflow,),
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM cache")
+                self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "memory_entries": len(self._mem),
+            }
@@ -0,0 +1,123 @@
+"""
+Byte-level charset detection for fetched pages.
+
+Order: BOM, HTTP Content-Type charset, <meta charset> in the first few KB,
+a strict UTF-8 attempt, the encoding previously found for the same domain,
+and finally charset_normalizer on a sample. Latin-1 style header
+charsets are distrusted when the body is valid UTF-8, since Khmer text
+cannot be encoded in them and such headers are usually server defaults.
+"""
+import codecs
+import re
+import threading
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+try:
+    from charset_normalizer import from_bytes  # installed with requests
+except ImportError:  # pragma: no cover
+    from_bytes = None
+
+
+META_SCAN_BYTES = 4096
+DETECT_SAMPLE_BYTES = 64 * 1024
+
+_HEADER_CHARSET_RE = re.compile(r"charset\s*=\s*[\"']?([\w.:-]+)", re.I)
+_META_CHARSET_RE = re.compile(
+    rb"<meta[^>]+charset\s*=\s*[\"']?\s*([\w.:-]+)", re.I
+)
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+_SINGLE_BYTE_WESTERN = {"iso8859-1", "cp1252", "ascii"}
+
+# host -> encoding found by meta scan or detection (never from headers).
+_domain_encodings: Dict[str, str] = {}
+_domain_lock = threading.Lock()
+
+
+def _normalize(name: Optional[str]) -> Optional[str]:
+    if not name:
+        return None
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+
+def charset_from_header(content_type: Optional[str]) -> Optional[str]:
+    match = _HEADER_CHARSET_RE.search(content_type or "")
+    return _normalize(match.group(1)) if match else None
+
+
+def charset_from_meta(body: bytes) -> Optional[str]:
+    match = _META_CHARSET_RE.search(body[:META_SCAN_BYTES])
+    return _normalize(match.group(1).decode("ascii", "ignore")) if match else None
+
+
+def _is_utf8(body: bytes) -> bool:
+    try:
+        body.decode("utf-8")
+    except UnicodeDecodeError:
+        # A byte cap can split the final character; ignore a short tail.
+        try:
+            body[:-3].decode("utf-8")
+        except UnicodeDecodeError:
+            return False
+    return True
+
+
+def _detect(body: bytes) -> str:
+    if _is_utf8(body):
+        return "utf-8"
+    if from_bytes is not None:
+        best = from_bytes(body[:DETECT_SAMPLE_BYTES]).best()
+        if best is not None:
+            return _normalize(best.encoding) or "utf-8"
+    return "utf-8"
+
+
+def detect_encoding(
+    body: bytes, content_type: Optional[str] = None, url: Optional[str] = None
+) -> str:
+    """Picks the encoding for a page body; see the module docstring."""
+    for bom, name in _BOMS:
+        if body.startswith(bom):
+            return name
+
+    declared = charset_from_header(content_type)
+    if declared and not (declared in _SINGLE_BYTE_WESTERN and _is_utf8(body)):
+        return declared
+
+    host = (urlsplit(url).hostname or "") if url else ""
+    meta = charset_from_meta(body)
+    if meta and not (meta in _SINGLE_BYTE_WESTERN and _is_utf8(body)):
+        if host:
+            with _domain_lock:
+                _domain_encodings[host] = meta
+        return meta
+
+    # Checked before the memo so one bad guess cannot poison a whole host.
+    if _is_utf8(body):
+        return "utf-8"
+
+    with _domain_lock:
+        known = _domain_encodings.get(host)
+    if known:
+        return known
+
+    encoding = _detect(body)
+    if host:
+        with _domain_lock:
+            _domain_encodings[host] = encoding
+    return encoding
+
+
+def decode_html(
+    body: bytes, content_type: Optional[str] = None, url: Optional[str] = None
+) -> Tuple[str, str]:
+    """Returns (text, encoding) for a page body."""
+    encoding = detect_encoding(body, content_type, url)
+    return body.decode(encoding, errors="replace"), encoding
@@ -0,0 +1,419 @@
+"""
+Fetch, extract and summarize logic shared by the Streamlit app and the
+batch CLI. Nothing here imports Streamlit.
+"""
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from khmer_news.batching import BatchItemError, BatchUnsupported
+from khmer_news.charset import decode_html
+from khmer_news.extract import extract_main_text
+from khmer_news.http_cache import HttpCache
+from khmer_news.resilience import breaker_for, is_failure_response, is_ngrok_error, retry_call
+from khmer_news.sites import rule_for_url
+
+
+# Browser-like headers to avoid simple 403 blocks.
+BROWSER_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9,km;q=0.8",
+}
+
+FETCH_TIMEOUT = 10
+# Wall-clock limit for a whole page download (slow-drip servers).
+FETCH_DEADLINE = 30
+# /summarize: fail fast on a dead tunnel, but give inference time to run.
+CONNECT_TIMEOUT = 5
+SUMMARIZE_TIMEOUT = 120
+SUMMARIZE_RETRIES = 2
+# Upper bound on time spent retrying before giving up.
+RETRY_BUDGET = 15
+
+# Pages are cut off after this many bytes; article text sits near the top.
+MAX_PAGE_BYTES = 3 * 1024 * 1024
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain", "application/xml")
+
+
+class FetchError(Exception):
+    """The URL was reachable but is not a usable article page."""
+
+
+def check_content_type(content_type: Optional[str]) -> None:
+    """Rejects PDFs, images, video etc. before their body is downloaded."""
+    if not content_type:
+        return
+    mime = content_type.split(";", 1)[0].strip().lower()
+    if mime not in HTML_CONTENT_TYPES:
+        raise FetchError(f"Not an HTML page (Content-Type: {mime})")
+
+
+# ==============================
+# 🔌 HTTP
+# ==============================
+def make_session(
+    pool_connections: int = 10,
+    pool_maxsize: int = 20,
+    keep_alive: bool = True,
+) -> requests.Session:
+    """
+    Pooled session with per-host connection pools. urllib3's pools are
+    thread-safe, so one session can be shared across worker threads.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=False,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["Connection"] = "keep-alive" if keep_alive else "close"
+    return session
+
+
+def _session(session: Optional[requests.Session]):
+    return session if session is not None else requests
+
+
+# ==============================
+# 🔎 FETCH & EXTRACT
+# ==============================
+@dataclass
+class Page:
+    url: str
+    html: str
+    not_modified: bool = False
+    # Extracted text from a previous visit, only set when not_modified.
+    cached_text: Optional[str] = None
+    # Body was cut off at max_bytes.
+    truncated: bool = False
+
+
+def _read_capped(resp: requests.Response, max_bytes: int) -> tuple:
+    """Streams the body into memory, stopping at max_bytes or the deadline."""
+    declared = resp.headers.get("Content-Length")
+    if declared and declared.isdigit() and int(declared) > max_bytes * 4:
+        raise FetchError(f"Page too large ({int(declared) // 1024} KB)")
+
+    chunks = []
+    size = 0
+    deadline = time.monotonic() + FETCH_DEADLINE
+    for chunk in resp.iter_content(chunk_size=DOWNLOAD_CHUNK_BYTES):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= max_bytes:
+            return b"".join(chunks)[:max_bytes], True
+        if time.monotonic() > deadline:
+            raise FetchError(f"Download took longer than {FETCH_DEADLINE}s")
+    return b"".join(chunks), False
+
+
+def fetch_page(
+    url: str,
+    session: Optional[requests.Session] = None,
+    http_cache: Optional[HttpCache] = None,
+    max_bytes: int = MAX_PAGE_BYTES,
+) -> Page:
+    """
+    Downloads a page. With an `http_cache`, revisits are conditional GETs
+    and a 304 is served from the cache. The body is streamed: non-HTML
+    responses are rejected from their headers and anything past
+    `max_bytes` is dropped. Raises on HTTP errors and FetchError.
+    """
+    cached = http_cache.get(url) if http_cache is not None else None
+    headers = dict(BROWSER_HEADERS)
+    if cached is not None:
+        headers.update(cached.validators())
+
+    with _session(session).get(
+        url, headers=headers, timeout=FETCH_TIMEOUT, stream=True
+    ) as resp:
+        if resp.status_code == 304 and cached is not None:
+            http_cache.mark_revalidated(url)
+            return Page(url, cached.body, not_modified=True, cached_text=cached.text)
+
+        resp.raise_for_status()
+        check_content_type(resp.headers.get("Content-Type"))
+        body, truncated = _read_capped(resp, max_bytes)
+        html, _ = decode_html(body, resp.headers.get("Content-Type"), url)
+
+    etag = resp.headers.get("ETag")
+    last_modified = resp.headers.get("Last-Modified")
+    # Without a validator the entry could never be revalidated; don't store it.
+    if http_cache is not None and (etag or last_modified):
+        http_cache.store(url, html, etag=etag, last_modified=last_modified)
+    return Page(url, html, truncated=truncated)
+
+
+def extract_main_text_from_url(
+    url: str,
+    session: Optional[requests.Session] = None,
+    http_cache: Optional[HttpCache] = None,
+) -> str:
+    """
+    Fetches the URL and extracts the main article text. An unchanged page
+    (304) reuses the text extracted on the previous visit. Sites with an
+    AMP rule are fetched from their AMP page first.
+    """
+    rule = rule_for_url(url)
+    if rule is not None and rule.amp_url is not None:
+        amp_url = rule.amp_url(url)
+        try:
+            text = _extract_page(amp_url, session, http_cache, source_url=url)
+            if text:
+                return text
+        except (requests.exceptions.RequestException, FetchError):
+            pass  # fall back to the canonical page
+    return _extract_page(url, session, http_cache, source_url=url)
+
+
+def _extract_page(
+    url: str,
+    session: Optional[requests.Session],
+    http_cache: Optional[HttpCache],
+    source_url: str,
+) -> str:
+    page = fetch_page(url, session=session, http_cache=http_cache)
+    if page.cached_text is not None:
+        return page.cached_text
+
+    text = extract_main_text(page.html, url=source_url)
+    if http_cache is not None:
+        http_cache.store_text(url, text)
+    return text
+
+
+# ==============================
+# 🧠 SUMMARIZER BACKEND
+# ==============================
+# Answers meaning "this backend has no such endpoint".
+UNSUPPORTED_STATUS = (404, 405, 501)
+
+
+def summarize_endpoint(api_base: str) -> str:
+    return api_base.rstrip("/") + "/summarize"
+
+
+def post_backend(
+    api_base: str,
+    url: str,
+    payload: dict,
+    session: Optional[requests.Session] = None,
+    optional_endpoint: bool = False,
+    **kwargs,
+) -> requests.Response:
+    """
+    POSTs to a backend URL through the backend's circuit breaker, with
+    separate connect/read timeouts and jittered retries on connection
+    errors and gateway statuses. Failure statuses (5xx, 429) are raised so
+    the breaker counts them; other HTTP errors are left to the caller.
+    For an `optional_endpoint` (/summarize_stream, /summarize_batch), the
+    backend's "not implemented" answers (UNSUPPORTED_STATUS) are returned
+    as-is so the caller can fall back.
+    """
+    def attempt() -> requests.Response:
+        resp = _session(session).post(
+            url, json=payload, timeout=(CONNECT_TIMEOUT, SUMMARIZE_TIMEOUT), **kwargs
+        )
+        if (
+            optional_endpoint
+            and resp.status_code in UNSUPPORTED_STATUS
+            and not is_ngrok_error(resp)
+        ):
+            return resp
+        if is_failure_response(resp):
+            resp.close()
+            resp.raise_for_status()
+        return resp
+
+    return breaker_for(api_base).call(
+        lambda: retry_call(attempt, retries=SUMMARIZE_RETRIES, budget=RETRY_BUDGET),
+        name=api_base,
+    )
+
+
+def summarize(
+    text: str,
+    api_base: str,
+    max_tokens: int = 256,
+    temperature: float = 0.5,
+    session: Optional[requests.Session] = None,
+) -> str:
+    """
+    Calls the FastAPI /summarize backend and returns the stripped summary
+    (possibly empty). Raises requests exceptions on transport/HTTP errors,
+    including CircuitOpenError when the backend is known to be down.
+    """
+    payload = {
+        "text": text,
+        "max_tokens": max_tokens,
+        "temperature": float(temperature),
+    }
+    resp = post_backend(api_base, summarize_endpoint(api_base), payload, session=session)
+    resp.raise_for_status()
+    data = resp.json()
+    return data.get("summary", "").strip()
+
+
+def summarize_batch(
+    items: List[dict],
+    api_base: str,
+    session: Optional[requests.Session] = None,
+) -> list:
+    """
+    POST /summarize_batch with several {"text", "max_tokens", "temperature"}
+    items. Returns one stripped summary or BatchItemError per item, in
+    order. Raises BatchUnsupported if the backend has no batch endpoint.
+    """
+    url = api_base.rstrip("/") + "/summarize_batch"
+    resp = post_backend(api_base, url, {"items": items}, session=session, optional_endpoint=True)
+    if resp.status_code in UNSUPPORTED_STATUS:
+        raise BatchUnsupported(url)
+    resp.raise_for_status()
+    data = resp.json()
+
+    results = data.get("results")
+    if results is None:
+        results = [{"summary": s} for s in data.get("summaries", [])]
+    if len(results) != len(items):
+        raise ValueError(f"{url} returned {len(results)} results for {len(items)} items")
+
+    out = []
+    for result in results:
+        if isinstance(result, dict) and result.get("error"):
+            out.append(BatchItemError(str(result["error"])))
+        else:
+            summary = result.get("summary", "") if isinstance(result, dict) else str(result)
+            out.append(summary.strip())
+    return out
+
+
+# ==============================
+# 📡 STREAMING SUMMARIES
+# ==============================
+class StreamingUnsupported(Exception):
+    """The backend has no /summarize_stream endpoint."""
+
+
+# Backends that answered /summarize_stream with 404/405/501.
+_no_stream_backends = set()
+_no_stream_lock = threading.Lock()
+
+
+def stream_endpoint(api_base: str) -> str:
+    return api_base.rstrip("/") + "/summarize_stream"
+
+
+def _stream_token(line: str) -> Optional[str]:
+    """
+    Text carried by one SSE `data:` line or NDJSON line: a JSON object
+    with "token"/"delta"/"text", a JSON string, or plain text.
+    """
+    try:
+        obj = json.loads(line)
+    except ValueError:
+        return line
+    if isinstance(obj, str):
+        return obj
+    if isinstance(obj, dict):
+        for key in ("token", "delta", "text"):
+            if isinstance(obj.get(key), str):
+                return obj[key]
+        return None
+    return line
+
+
+def stream_summary(
+    text: str,
+    api_base: str,
+    max_tokens: int = 256,
+    temperature: float = 0.5,
+    session: Optional[requests.Session] = None,
+) -> Iterator[str]:
+    """
+    Yields summary pieces from POST /summarize_stream as they arrive.
+    Understands Server-Sent Events (`data: ...`, `[DONE]`) and chunked
+    NDJSON. Raises StreamingUnsupported before yielding anything if the
+    endpoint does not exist.
+    """
+    payload = {
+        "text": text,
+        "max_tokens": max_tokens,
+        "temperature": float(temperature),
+    }
+    resp = post_backend(
+        api_base,
+        stream_endpoint(api_base),
+        payload,
+        session=session,
+        optional_endpoint=True,
+        stream=True,
+        headers={"Accept": "text/event-stream, application/x-ndjson"},
+    )
+    with resp:
+        if resp.status_code in UNSUPPORTED_STATUS:
+            raise StreamingUnsupported(stream_endpoint(api_base))
+        resp.raise_for_status()
+
+        for raw in resp.iter_lines():
+            line = raw.decode("utf-8", errors="replace")
+            if not line or line.startswith(":"):
+                continue  # blank separator or SSE keep-alive comment
+            if line.startswith(("event:", "id:", "retry:")):
+                continue
+            if line.startswith("data:"):
+                line = line[5:]
+                if line.startswith(" "):
+                    line = line[1:]
+            if line.strip() == "[DONE]":
+                return
+            if line.startswith("{") and '"done"' in line:
+                try:
+                    if json.loads(line).get("done"):
+                        return
+                except ValueError:
+                    pass
+            token = _stream_token(line)
+            if token:
+                yield token
+
+
+def iter_summary(
+    text: str,
+    api_base: str,
+    max_tokens: int = 256,
+    temperature: float = 0.5,
+    session: Optional[requests.Session] = None,
+) -> Iterator[str]:
+    """
+    Streams the summary when the backend supports it, otherwise yields the
+    blocking /summarize result as a single piece. Backends without a
+    streaming endpoint are remembered so they are not probed again.
+    """
+    key = api_base.rstrip("/")
+    with _no_stream_lock:
+        streaming = key not in _no_stream_backends
+    if streaming:
+        try:
+            yield from stream_summary(
+                text, api_base, max_tokens=max_tokens, temperature=temperature, session=session
+            )
+            return
+        except StreamingUnsupported:
+            with _no_stream_lock:
+                _no_stream_backends.add(key)
+    yield summarize(
+        text, api_base, max_tokens=max_tokens, temperature=temperature, session=session
+    )
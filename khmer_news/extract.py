@@ -0,0 +1,390 @@
+"""
+Article text extraction with a pluggable HTML parser.
+
+"lxml" (libxml2, C) is the default and much faster than BeautifulSoup's
+pure-Python "html.parser", which remains available as a fallback and is
+used automatically when lxml is not installed. Pick one with the
+`parser` argument or the EXTRACT_PARSER environment variable.
+
+The default "readability" strategy scores DOM subtrees by text and link
+density and keeps only the article body, dropping comments, teasers and
+footers. "paragraphs" is the original every-long-<p> heuristic; select it
+with the `strategy` argument or EXTRACT_STRATEGY.
+
+When the page URL is known, a site rule from khmer_news.sites is tried
+before either strategy.
+"""
+import json
+import os
+import re
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+
+import soupsieve  # installed with beautifulsoup4
+from bs4 import BeautifulSoup  # pip install beautifulsoup4
+
+from khmer_news.sites import SiteRule, rule_for_url
+
+try:
+    import lxml.etree
+    import lxml.html  # pip install lxml
+    from lxml.cssselect import CSSSelector  # pip install cssselect
+except ImportError:  # pragma: no cover - optional speedup
+    lxml = None
+
+
+# Paragraphs shorter than this are treated as UI chrome, not article text.
+MIN_PARAGRAPH_CHARS = 40
+
+# Subtrees that never hold article text.
+BOILERPLATE_TAGS = (
+    "script", "style", "noscript", "iframe", "form", "nav", "footer", "aside", "header",
+)
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "ul", "ol", "table", "blockquote",
+    "pre", "h1", "h2", "h3", "h4", "h5", "h6", "figure", "dl",
+}
+# Containers whose class/id marks them as chrome rather than content.
+UNLIKELY_TAGS = {"div", "section", "aside", "ul", "ol", "li", "span", "table", "figure"}
+UNLIKELY_RE = re.compile(
+    r"comment|footer|related|recommend|sidebar|share|social|promo|advert|\bads?\b|"
+    r"breadcrumb|menu|\bnav|widget|popup|cookie|subscribe|newsletter|\btags?\b|"
+    r"author-bio|more-news|most-read|trending",
+    re.I,
+)
+POSITIVE_RE = re.compile(r"article|body|content|entry|main|post|story|text|detail", re.I)
+SENTENCE_END = ("។", "៕", ".", "!", "?", "”", '"')
+
+TAG_WEIGHTS = {
+    "article": 10, "main": 10, "div": 5, "section": 3, "td": 3, "blockquote": 3, "pre": 3,
+    "ul": -3, "ol": -3, "li": -3, "dl": -3, "form": -3,
+    "h1": -5, "h2": -5, "h3": -5, "h4": -5, "h5": -5, "h6": -5, "th": -5,
+}
+
+
+# ==============================
+# 🌳 DOM ADAPTERS
+# ==============================
+# Site rules reuse a handful of selectors across every page; compile once.
+@lru_cache(maxsize=256)
+def _lxml_selector(css: str):
+    return CSSSelector(css)
+
+
+@lru_cache(maxsize=256)
+def _bs4_selector(css: str):
+    return soupsieve.compile(css)
+
+
+class _LxmlDom:
+    def __init__(self, html: str):
+        # Parse bytes so pages with an XML encoding declaration are accepted.
+        parser = lxml.html.HTMLParser(encoding="utf-8")
+        try:
+            self.root = lxml.html.fromstring(html.encode("utf-8"), parser=parser)
+        except lxml.etree.ParserError:
+            # "Document is empty" (e.g. only a comment): an empty tree, as
+            # html.parser gives.
+            self.root = lxml.html.Element("html")
+
+    def elements(self, *tags):
+        return [el for el in self.root.iter(*tags) if isinstance(el.tag, str)]
+
+    def drop(self, el) -> None:
+        if el.getparent() is not None:
+            el.drop_tree()
+
+    def tag(self, el) -> str:
+        return el.tag.lower()
+
+    def parent(self, el):
+        return el.getparent()
+
+    def children(self, el):
+        return [c for c in el if isinstance(c.tag, str)]
+
+    def class_id(self, el) -> str:
+        return f"{el.get('class', '')} {el.get('id', '')}"
+
+    def text(self, el) -> str:
+        return "".join(t.strip() for t in el.itertext())
+
+    def link_text(self, el) -> str:
+        return "".join(self.text(a) for a in el.iter("a"))
+
+    def select(self, css: str):
+        return _lxml_selector(css)(self.root)
+
+    def within(self, el, *tags):
+        return [d for d in el.iter(*tags) if isinstance(d.tag, str)]
+
+    def json_ld(self) -> List[str]:
+        return [
+            el.text or ""
+            for el in self.root.iter("script")
+            if (el.get("type") or "").lower() == "application/ld+json"
+        ]
+
+
+class _Bs4Dom:
+    def __init__(self, html: str):
+        self.root = BeautifulSoup(html, "html.parser")
+
+    def elements(self, *tags):
+        return self.root.find_all(list(tags) or True)
+
+    def drop(self, el) -> None:
+        if not el.decomposed:
+            el.decompose()
+
+    def tag(self, el) -> str:
+        return el.name.lower()
+
+    def parent(self, el):
+        parent = el.parent
+        return None if parent is None or parent is self.root else parent
+
+    def children(self, el):
+        return el.find_all(True, recursive=False)
+
+    def class_id(self, el) -> str:
+        return f"{' '.join(el.get('class') or [])} {el.get('id') or ''}"
+
+    def text(self, el) -> str:
+        return el.get_text(strip=True)
+
+    def link_text(self, el) -> str:
+        return "".join(a.get_text(strip=True) for a in el.find_all("a"))
+
+    def select(self, css: str):
+        return _bs4_selector(css).select(self.root)
+
+    def within(self, el, *tags):
+        # Match lxml's iter(): include the element itself.
+        found = el.find_all(list(tags))
+        return [el] + found if self.tag(el) in tags else found
+
+    def json_ld(self) -> List[str]:
+        return [
+            el.string or ""
+            for el in self.root.find_all("script")
+            if (el.get("type") or "").lower() == "application/ld+json"
+        ]
+
+
+PARSERS: Dict[str, Callable[[str], object]] = {
+    "html.parser": _Bs4Dom,
+}
+if lxml is not None:
+    PARSERS["lxml"] = _LxmlDom
+
+DEFAULT_PARSER = os.environ.get("EXTRACT_PARSER", "lxml")
+DEFAULT_STRATEGY = os.environ.get("EXTRACT_STRATEGY", "readability")
+
+
+def resolve_parser(name: Optional[str] = None) -> str:
+    """Returns an available parser name, falling back to html.parser."""
+    name = name or DEFAULT_PARSER
+    return name if name in PARSERS else "html.parser"
+
+
+# ==============================
+# 📄 STRATEGIES
+# ==============================
+def _paragraphs(dom) -> List[str]:
+    """Original heuristic: every <p> longer than MIN_PARAGRAPH_CHARS."""
+    paragraphs = [dom.text(p) for p in dom.elements("p")]
+    return [p for p in paragraphs if len(p) > MIN_PARAGRAPH_CHARS]
+
+
+def _link_density(dom, el, text: str) -> float:
+    return len(dom.link_text(el)) / len(text) if text else 1.0
+
+
+def _is_leaf_block(dom, el) -> bool:
+    return not any(dom.tag(c) in BLOCK_TAGS for c in dom.children(el))
+
+
+def _class_weight(dom, el) -> int:
+    names = dom.class_id(el)
+    weight = 0
+    if UNLIKELY_RE.search(names):
+        weight -= 25
+    if POSITIVE_RE.search(names):
+        weight += 25
+    return weight
+
+
+def _keep_paragraph(dom, el, text: str) -> bool:
+    """Long enough, or a short link-free sentence, and not a link list."""
+    if _link_density(dom, el, text) >= 0.5:
+        return False
+    return len(text) > MIN_PARAGRAPH_CHARS or (
+        not dom.link_text(el) and text.endswith(SENTENCE_END)
+    )
+
+
+def _text_blocks(dom, elements) -> list:
+    """(element, text) for each <p> and leaf <div> with text."""
+    blocks = []
+    for el in elements:
+        if dom.tag(el) == "div" and not _is_leaf_block(dom, el):
+            continue
+        text = dom.text(el)
+        if text:
+            blocks.append((el, text))
+    return blocks
+
+
+def _find_article_body(node) -> Optional[str]:
+    if isinstance(node, list):
+        for item in node:
+            body = _find_article_body(item)
+            if body:
+                return body
+    elif isinstance(node, dict):
+        body = node.get("articleBody")
+        if isinstance(body, str) and body.strip():
+            return body
+        for key in ("@graph", "mainEntity", "mainEntityOfPage"):
+            body = _find_article_body(node.get(key))
+            if body:
+                return body
+    return None
+
+
+def _json_ld_paragraphs(dom) -> List[str]:
+    for raw in dom.json_ld():
+        try:
+            body = _find_article_body(json.loads(raw))
+        except ValueError:
+            continue
+        if body:
+            if "<" in body:
+                body = BeautifulSoup(body, "html.parser").get_text()
+            return [line.strip() for line in body.splitlines() if line.strip()]
+    return []
+
+
+def _site_paragraphs(dom, rule: SiteRule) -> List[str]:
+    """Reads only the subtree a site rule points at (or its JSON-LD body)."""
+    if rule.json_ld:
+        paragraphs = _json_ld_paragraphs(dom)
+        if paragraphs:
+            return paragraphs
+    for css in rule.selectors:
+        nodes = dom.select(css)
+        if not nodes:
+            continue
+        paragraphs = []
+        for node in nodes:
+            blocks = _text_blocks(dom, dom.within(node, "p", "div"))
+            if blocks:
+                paragraphs.extend(t for el, t in blocks if _keep_paragraph(dom, el, t))
+            else:
+                text = dom.text(node)
+                if text:
+                    paragraphs.append(text)
+        if paragraphs:
+            return paragraphs
+    return []
+
+
+def _readability(dom) -> List[str]:
+    """
+    Readability-style scoring: each text block credits its parent and
+    (half) its grandparent by length and punctuation; candidates are
+    penalized by link density and the best one (plus strong siblings)
+    is taken as the article body.
+    """
+    for el in dom.elements(*BOILERPLATE_TAGS):
+        dom.drop(el)
+    for el in dom.elements(*UNLIKELY_TAGS):
+        names = dom.class_id(el)
+        if UNLIKELY_RE.search(names) and not POSITIVE_RE.search(names):
+            dom.drop(el)
+
+    blocks = _text_blocks(dom, dom.elements("p", "div"))
+
+    # id(element) -> [element, score]; elements are kept alive by the list.
+    candidates: Dict[int, list] = {}
+
+    def candidate(el) -> list:
+        entry = candidates.get(id(el))
+        if entry is None:
+            entry = [el, TAG_WEIGHTS.get(dom.tag(el), 0) + _class_weight(dom, el)]
+            candidates[id(el)] = entry
+        return entry
+
+    for el, text in blocks:
+        if len(text) < 25:
+            continue
+        score = 1 + sum(text.count(c) for c in (",", "،", "។", "៕")) + min(len(text) / 100, 3)
+        parent = dom.parent(el)
+        if parent is None:
+            continue
+        candidate(parent)[1] += score
+        grandparent = dom.parent(parent)
+        if grandparent is not None:
+            candidate(grandparent)[1] += score / 2
+
+    if not candidates:
+        return []
+    for entry in candidates.values():
+        entry[1] *= 1 - _link_density(dom, entry[0], dom.text(entry[0]))
+    top, top_score = max(candidates.values(), key=lambda e: e[1])
+
+    # Siblings that score close to the winner are part of the article too
+    # (e.g. body split across several <div>s).
+    selected = {id(top)}
+    top_parent = dom.parent(top)
+    if top_parent is not None:
+        threshold = max(10, top_score * 0.2)
+        for sibling in dom.children(top_parent):
+            entry = candidates.get(id(sibling))
+            if entry is not None and entry[1] >= threshold:
+                selected.add(id(sibling))
+
+    paragraphs = []
+    for el, text in blocks:
+        node = el
+        while node is not None and id(node) not in selected:
+            node = dom.parent(node)
+        if node is not None and _keep_paragraph(dom, el, text):
+            paragraphs.append(text)
+    return paragraphs
+
+
+STRATEGIES = {
+    "readability": _readability,
+    "paragraphs": _paragraphs,
+}
+
+
+def extract_main_text(
+    html: str,
+    parser: Optional[str] = None,
+    strategy: Optional[str] = None,
+    url: Optional[str] = None,
+) -> str:
+    """
+    Extracts the main article text, one paragraph per line. A matching
+    site rule for `url` wins; otherwise the chosen strategy runs, falling
+    back to the plain paragraph heuristic when scoring finds no body.
+    """
+    if not html.strip():
+        return ""
+    dom_class = PARSERS[resolve_parser(parser)]
+    dom = dom_class(html)
+
+    rule = rule_for_url(url) if url else None
+    if rule is not None:
+        paragraphs = _site_paragraphs(dom, rule)
+        if paragraphs:
+            return "\n".join(paragraphs)
+
+    strategy = strategy or DEFAULT_STRATEGY
+    paragraphs = STRATEGIES.get(strategy, _readability)(dom)
+    if not paragraphs and strategy != "paragraphs":
+        paragraphs = _paragraphs(dom_class(html))
+    return "\n".join(paragraphs)
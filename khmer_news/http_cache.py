@@ -0,0 +1,101 @@
+"""
+Persistent conditional-GET cache for article pages.
+
+Stores each page's body with its ETag / Last-Modified validators so a
+revisit can send If-None-Match / If-Modified-Since and serve a 304 from
+disk. The extracted article text is stored alongside the body, so a 304
+skips both the download and the HTML parsing.
+"""
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+
+@dataclass
+class CachedPage:
+    url: str
+    body: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    text: Optional[str] = None
+    fetched: float = 0.0
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating this page."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """SQLite-backed page store, safe to share across threads."""
+
+    def __init__(self, db_path: str = ":memory:", max_entries: int = 5_000):
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " url TEXT PRIMARY KEY,"
+            " body TEXT NOT NULL,"
+            " etag TEXT,"
+            " last_modified TEXT,"
+            " text TEXT,"
+            " fetched REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS pages_fetched ON pages(fetched)")
+        self._db.commit()
+        self.revalidated = 0
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, etag, last_modified, text, fetched FROM pages WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        return CachedPage(url, *row)
+
+    def store(
+        self,
+        url: str,
+        body: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        """Stores a fresh 200 response; any previously extracted text is dropped."""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages (url, body, etag, last_modified, text, fetched)"
+                " VALUES (?, ?, ?, ?, NULL, ?)",
+                (url, body, etag, last_modified, time.time()),
+            )
+            (count,) = self._db.execute("SELECT COUNT(*) FROM pages").fetchone()
+            if count > self.max_entries:
+                self._db.execute(
+                    "DELETE FROM pages WHERE url IN "
+                    "(SELECT url FROM pages ORDER BY fetched ASC LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+            self._db.commit()
+
+    def store_text(self, url: str, text: str) -> None:
+        with self._lock:
+            self._db.execute("UPDATE pages SET text = ? WHERE url = ?", (text, url))
+            self._db.commit()
+
+    def mark_revalidated(self, url: str) -> None:
+        """Records a 304 so the entry counts as recently used."""
+        with self._lock:
+            self.revalidated += 1
+            self._db.execute("UPDATE pages SET fetched = ? WHERE url = ?", (time.time(), url))
+            self._db.commit()
@@ -0,0 +1,120 @@
+"""
+In-memory job queue for summarize requests.
+
+The Streamlit script submits a job and returns immediately; a small worker
+pool runs the backend call and the UI polls the job (an auto-refreshing
+fragment) for progress and the result. A few workers can then serve many
+sessions without holding script threads for the whole inference.
+
+Jobs with the same key (the summary cache key) are coalesced: submitting
+while an identical job is queued or running returns that job. Finished
+jobs are kept for `retention` seconds so sessions can pick up the result.
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+
+JOB_WORKERS = 4
+JOB_RETENTION = 600.0  # seconds
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+@dataclass
+class Job:
+    id: str
+    key: Optional[str] = None
+    status: str = QUEUED
+    message: str = ""
+    partial: str = ""
+    result: Any = None
+    error: Optional[BaseException] = None
+    created: float = field(default_factory=time.monotonic)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.monotonic()) - self.created
+
+    def append(self, piece: str) -> None:
+        """Adds streamed output, readable by pollers while the job runs."""
+        self.partial += piece
+
+
+class JobQueue:
+    """Thread-safe job registry backed by a worker pool."""
+
+    def __init__(self, workers: int = JOB_WORKERS, retention: float = JOB_RETENTION):
+        self.retention = retention
+        self._jobs: Dict[str, Job] = {}
+        self._active: Dict[str, Job] = {}  # key -> queued/running job
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="summarize-job")
+
+    def submit(self, fn: Callable[[Job], Any], key: Optional[str] = None) -> Job:
+        """
+        Queues fn(job); its return value becomes job.result. fn may update
+        job.message and call job.append() to report progress.
+        """
+        with self._lock:
+            self._prune()
+            if key is not None and key in self._active:
+                return self._active[key]
+            job = Job(id=uuid.uuid4().hex, key=key)
+            self._jobs[job.id] = job
+            if key is not None:
+                self._active[key] = job
+        self._executor.submit(self._run, job, fn)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return counts
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    # ------ internals ------
+    def _run(self, job: Job, fn: Callable[[Job], Any]) -> None:
+        job.started = time.monotonic()
+        job.status = RUNNING
+        try:
+            job.result = fn(job)
+            job.status = DONE
+        except Exception as e:
+            job.error = e
+            job.status = FAILED
+        finally:
+            job.finished = time.monotonic()
+            with self._lock:
+                if job.key is not None and self._active.get(job.key) is job:
+                    del self._active[job.key]
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished is not None and now - job.finished > self.retention
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
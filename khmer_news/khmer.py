@@ -0,0 +1,163 @@
+"""
+Khmer sentence and word segmentation.
+
+Khmer writes words without spaces, so words are found by maximal
+(longest-match) matching against a dictionary trie. The trie is built
+over Khmer character clusters (a base consonant or vowel with its
+subscripts and dependent signs), not code points, so a match can never
+split a cluster and each step of the walk consumes a whole syllable part.
+
+A small seed lexicon of frequent news words is built in; point
+KHMER_DICT_PATH at a full word list (one word per line) for real
+coverage. Unknown stretches fall back to single clusters.
+"""
+import os
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+
+# ==============================
+# 🔤 CHARACTER CLASSES
+# ==============================
+_BASE = "\u1780-\u17b3"            # consonants + independent vowels
+_COENG = "\u17d2"                   # subscript marker
+_DEPENDENT = "\u17b4-\u17d1\u17d3\u17dd"  # vowels, diacritics, signs
+_KHMER_PUNCT = "\u17d4-\u17da"     # ។ ៕ ៖ ៗ ៘ ៙ ៚
+_KHMER_DIGITS = "\u17e0-\u17e9"
+_JOINERS = "\u200c\u200d"
+
+CLUSTER_RE = re.compile(
+    f"[{_BASE}](?:{_COENG}[{_BASE}])*[{_DEPENDENT}]*(?:{_COENG}[{_BASE}][{_DEPENDENT}]*)*"
+)
+# One token per Khmer run, Latin/number word, or punctuation mark.
+_RUN_RE = re.compile(
+    f"(?P<khmer>[{_BASE}{_COENG}{_DEPENDENT}{_JOINERS}]+)"
+    f"|(?P<word>[{_KHMER_DIGITS}0-9]+(?:[.,][{_KHMER_DIGITS}0-9]+)*|[^\\W\\d_]+)"
+    f"|(?P<punct>[{_KHMER_PUNCT}]|[^\\s\\w])"
+)
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[\u17d4\u17d5!?])\s*|\n+")
+_KHMER_START_RE = re.compile(f"[{_BASE}{_KHMER_DIGITS}]")
+
+# Zero-width space: optional word separator in many Khmer texts.
+ZWSP = "\u200b"
+
+
+def split_sentences(text: str) -> List[str]:
+    """Splits on Khmer (។ ៕) / Latin (! ?) sentence punctuation and line breaks."""
+    return [s.strip() for s in _SENTENCE_SPLIT_RE.split(text) if s and s.strip()]
+
+
+def split_clusters(text: str) -> List[str]:
+    """Khmer character clusters of a Khmer-only string."""
+    return CLUSTER_RE.findall(text)
+
+
+def is_khmer(token: str) -> bool:
+    """True for Khmer words and numbers, False for punctuation."""
+    return bool(_KHMER_START_RE.match(token))
+
+
+# ==============================
+# 🌲 DICTIONARY TRIE
+# ==============================
+_END = ""  # never a cluster, so safe as the terminal marker
+
+
+class WordSegmenter:
+    """Forward maximal-matching segmenter over a cluster trie."""
+
+    def __init__(self, words: Iterable[str] = ()):
+        self._trie: Dict[str, dict] = {}
+        self.size = 0
+        for word in words:
+            self.add(word)
+
+    def add(self, word: str) -> None:
+        clusters = split_clusters(word.strip().replace(ZWSP, ""))
+        if not clusters:
+            return
+        node = self._trie
+        for cluster in clusters:
+            node = node.setdefault(cluster, {})
+        if _END not in node:
+            node[_END] = {}
+            self.size += 1
+
+    def _segment_run(self, run: str) -> List[str]:
+        clusters = split_clusters(run)
+        words = []
+        i, n = 0, len(clusters)
+        trie = self._trie
+        while i < n:
+            node = trie
+            longest = 0
+            j = i
+            while j < n:
+                node = node.get(clusters[j])
+                if node is None:
+                    break
+                j += 1
+                if _END in node:
+                    longest = j - i
+            step = longest or 1
+            words.append("".join(clusters[i:i + step]))
+            i += step
+        return words
+
+    def segment(self, text: str) -> List[str]:
+        """Words, numbers and punctuation of `text`, whitespace dropped."""
+        tokens = []
+        for part in text.split(ZWSP):
+            for match in _RUN_RE.finditer(part):
+                if match.lastgroup == "khmer":
+                    tokens.extend(self._segment_run(match.group()))
+                else:
+                    tokens.append(match.group())
+        return tokens
+
+
+def load_dictionary(path: str) -> List[str]:
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+# Frequent function and news words; a starting point, not a lexicon.
+SEED_WORDS = (
+    "និង", "នៅ", "ដែល", "បាន", "ជា", "មាន", "ក្នុង", "របស់", "ថា", "ពី", "នេះ", "នោះ",
+    "ទៅ", "មក", "ដើម្បី", "សម្រាប់", "ដោយ", "ហើយ", "ប៉ុន្តែ", "ក៏", "ទេ", "នឹង", "កំពុង",
+    "ត្រូវ", "អាច", "លើ", "ក្រោម", "ចំពោះ", "តាម", "រវាង", "ទាំង", "ច្រើន", "ខ្លះ",
+    "ការ", "សេចក្តី", "ភាព", "អ្នក", "លោក", "លោកស្រី", "ឯកឧត្តម", "សម្តេច",
+    "កម្ពុជា", "ខ្មែរ", "ប្រទេស", "ព្រះរាជាណាចក្រ", "រាជធានី", "ភ្នំពេញ", "ខេត្ត", "ស្រុក",
+    "ឃុំ", "ភូមិ", "រដ្ឋាភិបាល", "នាយករដ្ឋមន្ត្រី", "រដ្ឋមន្ត្រី", "ក្រសួង", "អភិបាល",
+    "ប្រជាជន", "ពលរដ្ឋ", "សេដ្ឋកិច្ច", "នយោបាយ", "សង្គម", "អប់រំ", "សុខាភិបាល",
+    "អភិវឌ្ឍ", "គម្រោង", "សាងសង់", "ផ្លូវ", "ស្ពាន", "ទឹក", "ភ្លើង", "ដី",
+    "ឆ្នាំ", "ខែ", "ថ្ងៃ", "ម៉ោង", "សប្តាហ៍", "ដុល្លារ", "រៀល", "លាន", "ពាន់", "រយ",
+    "ព័ត៌មាន", "អត្ថបទ", "ប្រកាស", "ថ្លែង", "បញ្ជាក់", "យោង", "ប្រភព", "អ្នកសារព័ត៌មាន",
+    "ប៉ូលិស", "តុលាការ", "ច្បាប់", "បោះឆ្នោត", "គណបក្ស", "អន្តរជាតិ", "ថៃ", "វៀតណាម",
+    "ចិន", "អាមេរិក", "ជប៉ុន", "អាស៊ាន", "ពិភពលោក", "ថ្មី", "ធំ", "តូច", "ល្អ",
+)
+
+
+@lru_cache(maxsize=1)
+def default_segmenter() -> WordSegmenter:
+    """Seed lexicon plus the KHMER_DICT_PATH word list, if set."""
+    segmenter = WordSegmenter(SEED_WORDS)
+    path = os.environ.get("KHMER_DICT_PATH")
+    if path and os.path.exists(path):
+        for word in load_dictionary(path):
+            segmenter.add(word)
+    return segmenter
+
+
+def segment_words(text: str, segmenter: Optional[WordSegmenter] = None) -> List[str]:
+    return (segmenter or default_segmenter()).segment(text)
+
+
+def tokenize(text: str, segmenter: Optional[WordSegmenter] = None) -> List[str]:
+    """Lower-cased word tokens without punctuation, for retrieval and similarity."""
+    return [
+        t.lower()
+        for t in segment_words(text, segmenter)
+        if t[0].isalnum() or is_khmer(t)
+    ]
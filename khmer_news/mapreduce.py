@@ -0,0 +1,142 @@
+"""
+Map-reduce summarization for articles longer than the backend context.
+
+The text is split on Khmer sentence boundaries (។ ៕) into chunks that fit
+a token budget, chunks are summarized in parallel against /summarize and
+the joined partial summaries get a final reduce pass (recursively, if the
+partials themselves are still over budget). Latency is roughly one chunk
+call plus the reduce call. Inputs longer than MAX_MAP_CHUNKS chunks are
+first pre-compressed extractively with TextRank.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+import requests
+
+from khmer_news.core import summarize
+from khmer_news.khmer import split_sentences
+from khmer_news.textrank import extractive_summary
+from khmer_news.tokens import estimate_tokens
+
+
+# Input budget per /summarize call, in backend model tokens.
+CHUNK_TOKEN_BUDGET = 700
+MAP_WORKERS = 4
+# Longer inputs are first cut down extractively to this many chunks' worth.
+MAX_MAP_CHUNKS = 8
+
+
+def _hard_split(sentence: str, budget: int) -> List[str]:
+    """Cuts an over-long sentence at spaces (or anywhere) to fit the budget."""
+    chars_per_token = len(sentence) / max(1, estimate_tokens(sentence))
+    max_chars = max(1, int(budget * chars_per_token))
+    pieces = []
+    while len(sentence) > max_chars:
+        cut = sentence.rfind(" ", 0, max_chars)
+        if cut <= 0:
+            cut = max_chars
+        pieces.append(sentence[:cut].strip())
+        sentence = sentence[cut:].strip()
+    if sentence:
+        pieces.append(sentence)
+    return pieces
+
+
+def chunk_text(text: str, budget: int = CHUNK_TOKEN_BUDGET) -> List[str]:
+    """Greedily packs whole sentences into chunks of at most `budget` tokens."""
+    chunks: List[str] = []
+    current: List[str] = []
+    used = 0
+    for sentence in split_sentences(text):
+        pieces = _hard_split(sentence, budget) if estimate_tokens(sentence) > budget else [sentence]
+        for piece in pieces:
+            cost = estimate_tokens(piece)
+            if current and used + cost > budget:
+                chunks.append(" ".join(current))
+                current, used = [], 0
+            current.append(piece)
+            used += cost
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def _fit_budget(text: str, budget: int) -> str:
+    """Extractive compression guaranteed to fit a single call."""
+    chunks = chunk_text(extractive_summary(text, token_budget=budget) or text, budget)
+    return chunks[0] if chunks else ""
+
+
+def _compress_to_chunks(
+    text: str, budget: int, max_chunks: int = MAX_MAP_CHUNKS
+) -> Tuple[str, List[str]]:
+    """
+    Extractively shrinks text until it packs into at most `max_chunks`
+    chunks. Greedy packing leaves chunks part-empty, so the token target
+    is lowered until the chunk count fits.
+    """
+    target = budget * max_chunks
+    chunks = chunk_text(text, budget)
+    while len(chunks) > max_chunks:
+        compressed = extractive_summary(text, token_budget=target)
+        if not compressed or len(compressed) >= len(text):
+            # Nothing left to drop (e.g. one huge sentence): keep the lead.
+            chunks = chunks[:max_chunks]
+            return " ".join(chunks), chunks
+        text = compressed
+        chunks = chunk_text(text, budget)
+        target = int(target * 0.8)
+    return text, chunks
+
+
+def needs_chunking(text: str, budget: int = CHUNK_TOKEN_BUDGET) -> bool:
+    return estimate_tokens(text) > budget
+
+
+def summarize_long(
+    text: str,
+    api_base: str,
+    max_tokens: int = 256,
+    temperature: float = 0.5,
+    session: Optional[requests.Session] = None,
+    budget: int = CHUNK_TOKEN_BUDGET,
+    max_workers: int = MAP_WORKERS,
+    summarize_fn: Callable[..., str] = summarize,
+) -> str:
+    """
+    Summarizes text of any length. Short inputs are a single call; long
+    ones go through parallel map calls and a reduce call.
+    """
+    def call(part: str) -> str:
+        return summarize_fn(
+            part, api_base, max_tokens=max_tokens, temperature=temperature, session=session
+        )
+
+    chunks = chunk_text(text, budget)
+    if len(chunks) <= 1:
+        return call(text)
+    if len(chunks) > MAX_MAP_CHUNKS:
+        text, chunks = _compress_to_chunks(text, budget)
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+        partials = [p for p in pool.map(call, chunks) if p]
+    if not partials:
+        return ""
+
+    combined = "\n".join(partials)
+    if not needs_chunking(combined, budget):
+        return call(combined)
+    if estimate_tokens(combined) >= estimate_tokens(text):
+        # The map pass did not shrink the text, so another pass would not
+        # either; compress extractively to fit one reduce call.
+        return call(_fit_budget(combined, budget))
+    return summarize_long(
+        combined,
+        api_base,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        session=session,
+        budget=budget,
+        max_workers=max_workers,
+        summarize_fn=summarize_fn,
+    )
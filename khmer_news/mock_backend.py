@@ -0,0 +1,203 @@
+"""
+Local stand-in for the Kaggle /summarize backend, for load and resilience
+testing without GPU quota or an ngrok tunnel.
+
+    pip install -r requirements-mock.txt
+    python -m khmer_news.mock_backend --port 8000 \
+        --latency lognormal:2,0.5 --error-rate 0.05 --stream sse
+
+Then point the app (or `python -m khmer_news.batch --api-base ...`) at
+http://127.0.0.1:8000. Implements the same contract as the real backend:
+
+    POST /summarize         {"text", "max_tokens", "temperature"} -> {"summary"}
+    POST /summarize_stream  SSE (`data: {"token": ...}` ... `data: [DONE]`) or NDJSON
+    POST /summarize_batch   {"items": [...]} -> {"results": [{"summary"} | {"error"}]}
+    GET  /health
+    GET  /stats             request counters, for checking dedup/batching
+
+Summaries are the offline TextRank summary cut to `max_tokens`, so output
+is deterministic Khmer text of a realistic length.
+
+Latency distributions (seconds):
+    fixed:S  uniform:A,B  normal:MEAN,SD  lognormal:MEDIAN,SIGMA  exponential:MEAN
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+import uvicorn  # pip install -r requirements-mock.txt
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from khmer_news.textrank import extractive_summary
+
+
+STREAM_MODES = ("sse", "ndjson", "off")
+# Characters per streamed piece (roughly one or two Khmer words).
+PIECE_CHARS = 6
+
+
+class SummarizeRequest(BaseModel):
+    text: str
+    max_tokens: int = 256
+    temperature: float = 0.5
+
+
+class BatchRequest(BaseModel):
+    items: List[SummarizeRequest]
+
+
+def parse_latency(spec: str, rng: random.Random) -> Callable[[], float]:
+    """Sampler for a latency spec like "lognormal:2,0.5"; never negative."""
+    name, _, params = spec.partition(":")
+    args = [float(p) for p in params.split(",") if p.strip()]
+    samplers = {
+        "fixed": (1, lambda s: s),
+        "uniform": (2, lambda a, b: rng.uniform(a, b)),
+        "normal": (2, lambda mean, sd: rng.gauss(mean, sd)),
+        "lognormal": (2, lambda median, sigma: rng.lognormvariate(math.log(median), sigma)),
+        "exponential": (1, lambda mean: rng.expovariate(1.0 / mean)),
+    }
+    if name not in samplers or len(args) != samplers[name][0]:
+        raise ValueError(f"Bad latency spec {spec!r}; see --help")
+    sample = samplers[name][1]
+    return lambda: max(0.0, sample(*args))
+
+
+@dataclass
+class MockConfig:
+    latency: str = "lognormal:1.5,0.4"
+    token_delay: float = 0.03
+    error_rate: float = 0.0
+    error_status: int = 503
+    hang_rate: float = 0.0
+    hang_seconds: float = 300.0
+    stream: str = "sse"
+    batch: bool = True
+    batch_item_cost: float = 0.15
+    seed: Optional[int] = None
+
+
+def create_app(config: MockConfig) -> FastAPI:
+    rng = random.Random(config.seed)
+    sample_latency = parse_latency(config.latency, rng)
+    counters: Counter = Counter()
+    app = FastAPI(title="Mock Khmer summarizer")
+
+    def make_summary(req: SummarizeRequest) -> str:
+        return extractive_summary(req.text, token_budget=req.max_tokens) or req.text[:200]
+
+    async def simulate(cost: float = 1.0) -> None:
+        """Sleeps like inference; may hang (read timeouts) or fail (tunnel errors)."""
+        if rng.random() < config.hang_rate:
+            counters["hung"] += 1
+            await asyncio.sleep(config.hang_seconds)
+        await asyncio.sleep(sample_latency() * cost)
+        if rng.random() < config.error_rate:
+            counters["errors"] += 1
+            raise HTTPException(status_code=config.error_status, detail="mock backend error")
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/stats")
+    async def stats():
+        return dict(counters)
+
+    @app.post("/summarize")
+    async def summarize(req: SummarizeRequest):
+        counters["summarize"] += 1
+        await simulate()
+        return {"summary": make_summary(req)}
+
+    @app.post("/summarize_batch")
+    async def summarize_batch(req: BatchRequest):
+        if not config.batch:
+            raise HTTPException(status_code=404, detail="Not Found")
+        counters["batches"] += 1
+        counters["batch_items"] += len(req.items)
+        # A batched forward pass costs a bit more than a single one.
+        await simulate(1.0 + config.batch_item_cost * (len(req.items) - 1))
+        return {"results": [{"summary": make_summary(item)} for item in req.items]}
+
+    @app.post("/summarize_stream")
+    async def summarize_stream(req: SummarizeRequest):
+        if config.stream == "off":
+            raise HTTPException(status_code=404, detail="Not Found")
+        counters["streams"] += 1
+        # Time to first token; the rest arrives at token_delay per piece.
+        await simulate()
+        summary = make_summary(req)
+        pieces = [summary[i:i + PIECE_CHARS] for i in range(0, len(summary), PIECE_CHARS)]
+
+        async def sse():
+            for piece in pieces:
+                yield "data: " + json.dumps({"token": piece}, ensure_ascii=False) + "\n\n"
+                await asyncio.sleep(config.token_delay)
+            yield "data: [DONE]\n\n"
+
+        async def ndjson():
+            for piece in pieces:
+                yield json.dumps({"token": piece}, ensure_ascii=False) + "\n"
+                await asyncio.sleep(config.token_delay)
+            yield json.dumps({"done": True}) + "\n"
+
+        if config.stream == "ndjson":
+            return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+        return StreamingResponse(sse(), media_type="text/event-stream")
+
+    return app
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Mock /summarize backend for load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", default=MockConfig.latency, help="Time to (first) token")
+    parser.add_argument(
+        "--token-delay", type=float, default=MockConfig.token_delay, help="Seconds per streamed piece"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls that fail")
+    parser.add_argument("--error-status", type=int, default=MockConfig.error_status)
+    parser.add_argument(
+        "--hang-rate", type=float, default=0.0, help="Fraction of calls that stall (read timeouts)"
+    )
+    parser.add_argument("--hang-seconds", type=float, default=MockConfig.hang_seconds)
+    parser.add_argument("--stream", choices=STREAM_MODES, default=MockConfig.stream)
+    parser.add_argument("--no-batch", action="store_true", help="Answer 404 on /summarize_batch")
+    parser.add_argument(
+        "--batch-item-cost",
+        type=float,
+        default=MockConfig.batch_item_cost,
+        help="Extra latency per additional batch item, as a fraction of one call",
+    )
+    parser.add_argument("--seed", type=int)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    config = MockConfig(
+        latency=args.latency,
+        token_delay=args.token_delay,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        hang_rate=args.hang_rate,
+        hang_seconds=args.hang_seconds,
+        stream=args.stream,
+        batch=not args.no_batch,
+        batch_item_cost=args.batch_item_cost,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Gemini question answering over a summary and/or the original article.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Iterator
+
+import google.generativeai as genai  # pip install google-generativeai
+from google.generativeai import client as genai_client
+
+
+NO_ANSWER = "មិនអាចឆ្លើយបានពីបរិបទនេះទេ។"
+
+
+# genai.configure() mutates process-global state; serialize it.
+_configure_lock = threading.Lock()
+
+
+def make_model(api_key: str, model_name: str) -> "genai.GenerativeModel":
+    """
+    Builds a model bound to its own API key. The client is created right
+    after configure() under the lock, so later configure() calls for other
+    keys (other users) cannot change which key this model uses.
+    """
+    with _configure_lock:
+        genai.configure(api_key=api_key)
+        model = genai.GenerativeModel(model_name)
+        # The library otherwise resolves the global client lazily on first use.
+        model._client = genai_client.get_default_generative_client()
+    return model
+
+
+class GeminiModelCache:
+    """
+    Configured models keyed by (sha256 of API key, model name), so each
+    question reuses a ready client instead of reconfiguring. Raw keys are
+    never stored as cache keys. Thread-safe; bounded LRU.
+    """
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._models: "OrderedDict[tuple, genai.GenerativeModel]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, api_key: str, model_name: str) -> "genai.GenerativeModel":
+        key = (hashlib.sha256(api_key.encode("utf-8")).hexdigest(), model_name)
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+                return model
+        model = make_model(api_key, model_name)
+        with self._lock:
+            model = self._models.setdefault(key, model)
+            self._models.move_to_end(key)
+            while len(self._models) > self.max_entries:
+                self._models.popitem(last=False)
+        return model
+
+
+def build_prompt(context: str, question: str) -> str:
+    return f"""
+You are a helpful assistant answering questions using the context below.
+
+CONTEXT:
+{context}
+
+USER QUESTION:
+{question}
+
+Rules:
+- Answer in Khmer.
+- Base your answer ONLY on the context provided.
+- If the context doesn't contain enough information, say that you don't know
+  based on this context.
+"""
+
+
+def stream_answer(model: "genai.GenerativeModel", context: str, question: str) -> Iterator[str]:
+    """
+    Yields answer text as Gemini generates it. Chunks without text (e.g.
+    safety-blocked parts) are skipped; yields NO_ANSWER if nothing came back.
+    """
+    response = model.generate_content(build_prompt(context, question), stream=True)
+    answered = False
+    for chunk in response:
+        try:
+            text = chunk.text
+        except ValueError:
+            continue
+        if text:
+            answered = True
+            yield text
+    if not answered:
+        yield NO_ANSWER
+
+
+def answer(model: "genai.GenerativeModel", context: str, question: str) -> str:
+    """Blocking variant of stream_answer; returns the full answer text."""
+    return "".join(stream_answer(model, context, question)).strip()
@@ -0,0 +1,173 @@
+"""
+Retry and circuit-breaker helpers for the /summarize backend.
+
+ngrok tunnels flap: connection errors and 502/503/504 from the tunnel are
+retried with jittered exponential backoff inside a total time budget, and a
+per-backend circuit breaker fails fast after repeated failures so a dead
+tunnel does not hold every Streamlit worker for the full read timeout.
+"""
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional, TypeVar
+
+import requests
+
+T = TypeVar("T")
+
+# Gateway/tunnel errors that are safe to retry: the request never reached,
+# or never completed on, the model server.
+RETRYABLE_STATUS = {429, 502, 503, 504}
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """The backend's circuit is open; the call was not attempted."""
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """
+    Connection failures and gateway errors. Read timeouts are not retried:
+    the backend may still be generating, and a retry would double the wait.
+    """
+    if isinstance(exc, CircuitOpenError):
+        return False
+    if isinstance(exc, (requests.exceptions.ConnectionError, requests.exceptions.ConnectTimeout)):
+        return True
+    if isinstance(exc, requests.exceptions.HTTPError) and exc.response is not None:
+        return exc.response.status_code in RETRYABLE_STATUS
+    return False
+
+
+def is_ngrok_error(resp: requests.Response) -> bool:
+    """ngrok's own error pages (an offline tunnel answers 404 with ERR_NGROK_3200)."""
+    return "Ngrok-Error-Code" in resp.headers
+
+
+def is_failure_response(resp: requests.Response) -> bool:
+    """Responses that say the backend is unhealthy (not e.g. a 4xx from bad input)."""
+    if resp.status_code >= 500 or resp.status_code == 429:
+        return True
+    return is_ngrok_error(resp)
+
+
+def is_backend_failure(exc: BaseException) -> bool:
+    if isinstance(exc, requests.exceptions.HTTPError) and exc.response is not None:
+        return is_failure_response(exc.response)
+    return isinstance(exc, requests.exceptions.RequestException)
+
+
+def retry_call(
+    fn: Callable[[], T],
+    retries: int = 2,
+    base_delay: float = 0.5,
+    max_delay: float = 4.0,
+    budget: Optional[float] = None,
+    retry_on: Callable[[BaseException], bool] = is_retryable,
+) -> T:
+    """
+    Calls fn, retrying retryable failures with full-jitter exponential
+    backoff. Stops early when the next sleep would exceed `budget` seconds
+    since the first attempt.
+    """
+    started = time.monotonic()
+    attempt = 0
+    while True:
+        try:
+            return fn()
+        except Exception as e:
+            if attempt >= retries or not retry_on(e):
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+            if budget is not None and time.monotonic() - started + delay > budget:
+                raise
+            time.sleep(delay)
+            attempt += 1
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive failures;
+    open -> half-open after `reset_timeout` seconds, letting one trial call
+    through; the trial's outcome closes or re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        reset_timeout: float = 30.0,
+        is_failure: Callable[[BaseException], bool] = is_backend_failure,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.is_failure = is_failure
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def call(self, fn: Callable[[], T], name: str = "backend") -> T:
+        if not self.allow():
+            raise CircuitOpenError(f"{name} is unavailable (circuit open); try again shortly")
+        try:
+            result = fn()
+        except Exception as e:
+            if self.is_failure(e):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        self.record_success()
+        return result
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(key: str) -> CircuitBreaker:
+    """Process-wide breaker per backend base URL."""
+    key = key.rstrip("/")
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = _breakers[key] = CircuitBreaker()
+        return breaker
@@ -0,0 +1,97 @@
+"""
+Passage retrieval for Q&A over long articles.
+
+The article is split into passages of whole sentences, each passage is
+tokenized with the Khmer word segmenter, and passages are ranked against
+the question with Okapi BM25. Only the top-k passages (in article order)
+are sent to Gemini instead of the whole text.
+"""
+import math
+from collections import Counter
+from typing import List, Optional
+
+from khmer_news.khmer import WordSegmenter, split_sentences, tokenize
+from khmer_news.tokens import estimate_tokens
+
+
+PASSAGE_TOKEN_BUDGET = 150
+TOP_K = 4
+# Articles under this many Gemini tokens are sent whole.
+RETRIEVAL_MIN_TOKENS = 1500
+
+
+def split_passages(text: str, budget: int = PASSAGE_TOKEN_BUDGET) -> List[str]:
+    """Groups consecutive sentences into passages of about `budget` tokens."""
+    passages: List[str] = []
+    current: List[str] = []
+    used = 0
+    for sentence in split_sentences(text):
+        cost = estimate_tokens(sentence, profile="gemini")
+        if current and used + cost > budget:
+            passages.append(" ".join(current))
+            current, used = [], 0
+        current.append(sentence)
+        used += cost
+    if current:
+        passages.append(" ".join(current))
+    return passages
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of passages."""
+
+    def __init__(
+        self,
+        passages: List[str],
+        k1: float = 1.5,
+        b: float = 0.75,
+        segmenter: Optional[WordSegmenter] = None,
+    ):
+        self.passages = passages
+        self.k1 = k1
+        self.b = b
+        self.segmenter = segmenter
+        self._tfs = [Counter(tokenize(p, segmenter)) for p in passages]
+        self._lengths = [sum(tf.values()) for tf in self._tfs]
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+        df: Counter = Counter()
+        for tf in self._tfs:
+            df.update(tf.keys())
+        n = len(passages)
+        self._idf = {
+            term: math.log(1 + (n - freq + 0.5) / (freq + 0.5)) for term, freq in df.items()
+        }
+
+    @classmethod
+    def from_text(cls, text: str, budget: int = PASSAGE_TOKEN_BUDGET) -> "BM25Index":
+        return cls(split_passages(text, budget))
+
+    def scores(self, query: str) -> List[float]:
+        terms = set(tokenize(query, self.segmenter))
+        results = []
+        for tf, length in zip(self._tfs, self._lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / (self._avg_length or 1.0))
+            score = 0.0
+            for term in terms:
+                freq = tf.get(term)
+                if freq:
+                    score += self._idf[term] * freq * (self.k1 + 1) / (freq + norm)
+            results.append(score)
+        return results
+
+    def top_k(self, query: str, k: int = TOP_K) -> List[str]:
+        """
+        Best k passages in article order. When nothing matches (e.g. an
+        English question about a Khmer article) the lead passages are used.
+        """
+        scores = self.scores(query)
+        ranked = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
+        if not ranked or scores[ranked[0]] <= 0:
+            chosen = list(range(min(k, len(self.passages))))
+        else:
+            chosen = sorted(i for i in ranked[:k] if scores[i] > 0)
+        return [self.passages[i] for i in chosen]
+
+
+def needs_retrieval(text: str, min_tokens: int = RETRIEVAL_MIN_TOKENS) -> bool:
+    return estimate_tokens(text, profile="gemini") > min_tokens
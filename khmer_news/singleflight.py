@@ -0,0 +1,67 @@
+"""
+Single-flight coalescing of identical in-flight calls.
+
+When many users paste the same breaking story within seconds, the first
+request for a key (the summary cache key: text hash + params) becomes the
+leader and does the work; concurrent requests for the same key wait on the
+leader's result instead of sending their own /summarize call. Once the
+leader finishes the key is released, so later callers go to the cache.
+"""
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Thread-safe registry of in-flight calls keyed by string."""
+
+    def __init__(self):
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.followers = 0
+
+    def claim(self, key: str) -> Tuple[Future, bool]:
+        """
+        Returns (future, is_leader). The leader must call `finish` exactly
+        once; followers wait on `future.result()`.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.followers += 1
+                return future, False
+            future = self._calls[key] = Future()
+            self.leaders += 1
+            return future, True
+
+    def finish(self, key: str, result=None, error: BaseException = None) -> None:
+        """Publishes the leader's result (or error) and releases the key."""
+        with self._lock:
+            future = self._calls.pop(key, None)
+        if future is None:
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        """Runs fn once per key at a time; concurrent callers share its result."""
+        future, leader = self.claim(key)
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            self.finish(key, error=e)
+            raise
+        self.finish(key, result)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            in_flight = len(self._calls)
+        return {"leaders": self.leaders, "followers": self.followers, "in_flight": in_flight}
@@ -0,0 +1,98 @@
+"""
+Per-domain extraction rules for major Khmer news sites.
+
+Rules are consulted before the generic extractor: a site's JSON-LD
+`articleBody` is tried first, then its CSS selectors in order, so only the
+matched article subtree is read. `amp_url` rewrites an article URL to its
+AMP page when the regular page renders the body with JavaScript.
+Selectors reflect each site's markup at the time of writing; when none
+match, extraction silently falls through to the generic path.
+"""
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+@dataclass(frozen=True)
+class SiteRule:
+    name: str
+    domains: Tuple[str, ...]
+    selectors: Tuple[str, ...] = ()
+    json_ld: bool = True
+    amp_url: Optional[Callable[[str], str]] = field(default=None, compare=False)
+
+
+def _amp_path(url: str) -> str:
+    """`/amp/` appended to the path; query and fragment are dropped."""
+    parts = urlsplit(url)
+    return parts._replace(path=parts.path.rstrip("/") + "/amp/", query="", fragment="").geturl()
+
+
+_REGISTRY: Dict[str, SiteRule] = {}
+
+
+def register_site(rule: SiteRule) -> SiteRule:
+    """Adds (or replaces) the rule for each of its domains."""
+    for domain in rule.domains:
+        _REGISTRY[domain.lower()] = rule
+    return rule
+
+
+def rule_for_url(url: str) -> Optional[SiteRule]:
+    """Finds the rule for a URL's host, matching parent domains too."""
+    host = (urlsplit(url).hostname or "").lower()
+    while host:
+        rule = _REGISTRY.get(host)
+        if rule is not None:
+            return rule
+        _, _, host = host.partition(".")
+    return None
+
+
+register_site(SiteRule(
+    name="Khmer Times",
+    domains=("khmertimeskh.com",),
+    selectors=(".tdb_single_content .tdb-block-inner", ".td-post-content", ".entry-content"),
+))
+register_site(SiteRule(
+    name="RFA Khmer",
+    domains=("rfa.org",),
+    selectors=("#storytext", ".story-body", "article .body"),
+))
+register_site(SiteRule(
+    name="VOA Khmer",
+    domains=("khmer.voanews.com",),
+    selectors=("#article-content .wsw", ".body-container .wsw"),
+))
+register_site(SiteRule(
+    name="Thmey Thmey",
+    domains=("thmeythmey.com",),
+    selectors=(".detail-content", ".content-detail", "#detail"),
+))
+register_site(SiteRule(
+    name="Kampuchea Thmey",
+    domains=("kampucheathmey.com",),
+    selectors=(".entry-content", ".article-content"),
+    amp_url=_amp_path,
+))
+register_site(SiteRule(
+    name="Fresh News",
+    domains=("freshnewsasia.com",),
+    selectors=(".article-content", "[itemprop=articleBody]", ".item-page"),
+))
+register_site(SiteRule(
+    name="Sabay News",
+    domains=("news.sabay.com.kh", "sabay.com.kh"),
+    selectors=(".detail .content", ".article-body"),
+))
+register_site(SiteRule(
+    name="Post Khmer",
+    domains=("postkhmer.com",),
+    selectors=(".article-text", ".field--name-body"),
+))
+register_site(SiteRule(
+    name="CamboJA News",
+    domains=("cambojanews.com",),
+    selectors=(".entry-content",),
+    amp_url=_amp_path,
+))
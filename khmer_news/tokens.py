@@ -0,0 +1,103 @@
+"""
+Fast token-count estimates for Khmer text.
+
+A single regex pass counts Khmer character clusters, Latin words, digits
+and punctuation; a per-tokenizer linear model turns those counts into an
+estimate. The built-in weights are starting points. Fit real ones with
+`calibrate()` on (text, true token count) pairs from the backend
+tokenizer or Gemini's count_tokens, and save them with TOKEN_WEIGHTS_PATH
+(a JSON object of profile -> weights).
+"""
+import json
+import os
+import re
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, Tuple
+
+from khmer_news.khmer import CLUSTER_RE
+
+_FEATURE_RE = re.compile(
+    f"(?P<khmer>{CLUSTER_RE.pattern})"
+    r"|(?P<latin>[A-Za-z]+)"
+    r"|(?P<digit>[0-9០-៩])"
+    r"|(?P<space>\s+)"
+    r"|(?P<other>.)",
+    re.S,
+)
+FEATURES = ("khmer", "latin", "digit", "space", "other")
+
+
+@dataclass(frozen=True)
+class TokenWeights:
+    """Tokens per feature occurrence, plus a fixed per-request overhead."""
+    khmer: float
+    latin: float
+    digit: float
+    space: float
+    other: float
+    bias: float = 0.0
+
+
+# Profiles: "backend" is the fine-tuned /summarize model's SentencePiece
+# tokenizer, "gemini" the Gemini API tokenizer.
+DEFAULT_WEIGHTS: Dict[str, TokenWeights] = {
+    "backend": TokenWeights(khmer=0.9, latin=1.3, digit=0.5, space=0.1, other=1.0, bias=2.0),
+    "gemini": TokenWeights(khmer=0.6, latin=1.2, digit=0.4, space=0.05, other=1.0, bias=0.0),
+}
+
+
+def count_features(text: str) -> Dict[str, int]:
+    counts = dict.fromkeys(FEATURES, 0)
+    for match in _FEATURE_RE.finditer(text):
+        counts[match.lastgroup] += 1
+    return counts
+
+
+@lru_cache(maxsize=1)
+def _load_weights() -> Dict[str, TokenWeights]:
+    weights = dict(DEFAULT_WEIGHTS)
+    path = os.environ.get("TOKEN_WEIGHTS_PATH")
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for profile, values in json.load(f).items():
+                weights[profile] = TokenWeights(**values)
+    return weights
+
+
+def estimate_tokens(text: str, profile: str = "backend") -> int:
+    """Estimated token count of `text` for the given tokenizer profile."""
+    w = _load_weights()[profile]
+    c = count_features(text)
+    total = (
+        w.khmer * c["khmer"]
+        + w.latin * c["latin"]
+        + w.digit * c["digit"]
+        + w.space * c["space"]
+        + w.other * c["other"]
+        + w.bias
+    )
+    return max(0, round(total))
+
+
+def calibrate(samples: Iterable[Tuple[str, int]]) -> TokenWeights:
+    """
+    Least-squares fit of feature weights to true token counts, e.g. from
+    the backend tokenizer or Gemini's count_tokens over a few hundred
+    articles.
+    """
+    import numpy as np
+
+    rows, targets = [], []
+    for text, true_count in samples:
+        c = count_features(text)
+        rows.append([c[f] for f in FEATURES] + [1.0])
+        targets.append(true_count)
+    coef, *_ = np.linalg.lstsq(
+        np.array(rows, dtype=float), np.array(targets, dtype=float), rcond=None
+    )
+    return TokenWeights(*(max(0.0, float(x)) for x in coef))
+
+
+def weights_to_json(weights: Dict[str, TokenWeights]) -> str:
+    return json.dumps({name: asdict(w) for name, w in weights.items()}, indent=2)
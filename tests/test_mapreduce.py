@@ -0,0 +1,57 @@
+import threading
+import unittest
+
+from khmer_news.mapreduce import CHUNK_TOKEN_BUDGET, MAX_MAP_CHUNKS, chunk_text, summarize_long
+from khmer_news.tokens import estimate_tokens
+
+
+WORDS = ["រដ្ឋាភិបាល", "ប្រជាជន", "កម្ពុជា", "សេដ្ឋកិច្ច", "គម្រោង", "ថ្មី", "ភ្នំពេញ", "ទីផ្សារ"]
+
+
+def article(sentences: int) -> str:
+    return " ".join(
+        "".join(WORDS[(i + j) % len(WORDS)] for j in range(3 + i % 9)) + f" {i}។"
+        for i in range(sentences)
+    )
+
+
+class RecordingBackend:
+    """Stub summarize_fn; `shrink` is the fraction of the input it returns."""
+
+    def __init__(self, shrink: float):
+        self.shrink = shrink
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, text, api_base, max_tokens=256, temperature=0.5, session=None):
+        with self._lock:
+            self.calls.append(estimate_tokens(text))
+        return text[: max(1, int(len(text) * self.shrink))]
+
+
+class SummarizeLongTest(unittest.TestCase):
+    def test_article_is_long(self):
+        self.assertGreater(len(chunk_text(article(600))), MAX_MAP_CHUNKS)
+
+    def test_no_call_exceeds_budget(self):
+        for shrink in (0.1, 0.6, 1.0):
+            backend = RecordingBackend(shrink)
+            summary = summarize_long(article(600), "http://stub", summarize_fn=backend)
+            self.assertTrue(summary)
+            self.assertLessEqual(max(backend.calls), CHUNK_TOKEN_BUDGET, f"shrink={shrink}")
+
+    def test_map_pass_is_capped(self):
+        # A backend that does not shrink its input: one map pass over at
+        # most MAX_MAP_CHUNKS chunks, then one compressed reduce call.
+        backend = RecordingBackend(1.0)
+        summarize_long(article(2000), "http://stub", summarize_fn=backend)
+        self.assertLessEqual(len(backend.calls), MAX_MAP_CHUNKS + 1)
+
+    def test_short_text_is_one_call(self):
+        backend = RecordingBackend(0.5)
+        summarize_long(article(3), "http://stub", summarize_fn=backend)
+        self.assertEqual(len(backend.calls), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()